@@ -1,24 +1,167 @@
 """Модуль для регистрации моделей в админ-панели."""
 
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.admin.views.main import ChangeList
+from django.core.exceptions import ValidationError
+from django.db.models.functions import Substr
+from django.utils.text import Truncator
 
-from .models import Category, Comment, Location, Post
+from . import moderation
+from .models import Category, Comment, Job, Location, Post
+from .paginators import ApproximateCountPaginator
 
+# Длина отрывка текста в списках объектов.
+PREVIEW_LENGTH = 80
 
-class PostAdmin(admin.ModelAdmin):
+
+class LightChangeList(ChangeList):
+    """Класс списка объектов без тяжелых полей модели.
+
+    Поля из `list_defer` админки не читаются; начало текста объектов
+    страницы выбирается одним отдельным запросом, чтобы не вычислять
+    его в запросах подсчета и date_hierarchy.
+    """
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer(
+            *self.model_admin.list_defer
+        )
+
+    def get_results(self, request):
+        super().get_results(request)
+        starts = dict(
+            self.model._default_manager.filter(
+                pk__in=[obj.pk for obj in self.result_list]
+            ).values_list('pk', Substr('text', 1, PREVIEW_LENGTH + 1))
+        )
+        for obj in self.result_list:
+            obj.text_start = starts.get(obj.pk, '')
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Класс с общими настройками админки для больших таблиц.
+
+    Число объектов считается приближенно, полный подсчет таблицы
+    отключен, а в списке выводится отрывок текста вместо всего поля.
+    """
+
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
+    list_defer = ('text',)
+
+    def get_changelist(self, request, **kwargs):
+        return LightChangeList
+
+    @admin.display(description='Текст')
+    def text_preview(self, obj):
+        return Truncator(obj.text_start).chars(PREVIEW_LENGTH)
+
+
+class ModerationMixin:
+    """Класс массовых действий модерации.
+
+    Действия выполняются пакетными UPDATE и DELETE из модуля
+    `moderation`; функция изменения полей выборки задается
+    атрибутом `moderation_update`.
+    """
+
+    moderation_update = None
+
+    def report(self, request, message, result):
+        """Сообщает число обработанных объектов и пакетов."""
+        count, batches = result
+        self.message_user(
+            request,
+            f'{message}: {count} (пакетов: {batches}).',
+            messages.SUCCESS
+        )
+
+    @admin.action(
+        description='Опубликовать выбранные', permissions=('change',)
+    )
+    def publish(self, request, queryset):
+        self.report(
+            request,
+            'Опубликовано',
+            self.moderation_update(queryset, is_published=True)
+        )
+
+    @admin.action(
+        description='Снять с публикации выбранные', permissions=('change',)
+    )
+    def unpublish(self, request, queryset):
+        self.report(
+            request,
+            'Снято с публикации',
+            self.moderation_update(queryset, is_published=False)
+        )
+
+
+class PostActionForm(ActionForm):
+    """Класс формы действий со списком постов."""
+
+    category = forms.ModelChoiceField(
+        Category.objects.all(), required=False, label='Категория'
+    )
+
+
+class PostAdmin(ModerationMixin, LargeTableAdmin):
     """Класс для указания полей модели Post, отображаемых в админ-панели."""
 
     list_display = (
         'title',
-        'text',
+        'text_preview',
         'pub_date',
         'author',
         'location',
         'category'
     )
+    list_select_related = ('author', 'location', 'category')
+    list_defer = ('text', 'image_variants')
+    search_fields = ('title',)
+    date_hierarchy = 'pub_date'
+    autocomplete_fields = ('author', 'location', 'category')
+    action_form = PostActionForm
+    actions = ('publish', 'unpublish', 'move_to_category', 'delete_by_author')
+    moderation_update = staticmethod(moderation.update_posts)
+
+    @admin.action(
+        description='Перенести выбранные в категорию',
+        permissions=('change',)
+    )
+    def move_to_category(self, request, queryset):
+        try:
+            category = self.action_form.base_fields['category'].clean(
+                request.POST.get('category')
+            )
+        except ValidationError:
+            category = None
+        if category is None:
+            self.message_user(
+                request, 'Выберите категорию для переноса.', messages.WARNING
+            )
+            return
+        self.report(
+            request,
+            f'Перенесено в «{category}»',
+            moderation.update_posts(queryset, category=category)
+        )
+
+    @admin.action(
+        description='Удалить все посты авторов выбранных',
+        permissions=('delete',)
+    )
+    def delete_by_author(self, request, queryset):
+        self.report(
+            request,
+            'Удалено постов',
+            moderation.delete_posts_by_authors(queryset)
+        )
 
 
-class CategoryAdmin(admin.ModelAdmin):
+class CategoryAdmin(ModerationMixin, admin.ModelAdmin):
     """Класс для указания полей модели Category, отображаемых в админке."""
 
     list_display = (
@@ -26,9 +169,74 @@ class CategoryAdmin(admin.ModelAdmin):
         'description',
         'slug'
     )
+    search_fields = ('title', 'slug')
+    actions = ('publish', 'unpublish')
+    moderation_update = staticmethod(moderation.update_categories)
+
+
+class LocationAdmin(ModerationMixin, admin.ModelAdmin):
+    """Класс для указания полей модели Location, отображаемых в админке."""
+
+    search_fields = ('name',)
+    actions = ('publish', 'unpublish')
+    moderation_update = staticmethod(moderation.update_locations)
+
+
+class CommentAdmin(ModerationMixin, LargeTableAdmin):
+    """Класс для указания полей модели Comment, отображаемых в админке."""
+
+    list_display = (
+        'text_preview',
+        'post',
+        'author',
+        'created_at'
+    )
+    # Заголовок поста читается в том же запросе, без его текста.
+    list_select_related = ('post', 'author')
+    list_defer = ('text', 'post__text', 'post__image_variants')
+    raw_id_fields = ('post',)
+    autocomplete_fields = ('author',)
+    actions = ('delete_comments', 'delete_by_author')
+
+    @admin.action(
+        description='Удалить выбранные комментарии пакетно',
+        permissions=('delete',)
+    )
+    def delete_comments(self, request, queryset):
+        self.report(
+            request,
+            'Удалено комментариев',
+            moderation.delete_comments(queryset)
+        )
+
+    @admin.action(
+        description='Удалить все комментарии авторов выбранных',
+        permissions=('delete',)
+    )
+    def delete_by_author(self, request, queryset):
+        self.report(
+            request,
+            'Удалено комментариев',
+            moderation.delete_comments_by_authors(queryset)
+        )
+
+
+class JobAdmin(admin.ModelAdmin):
+    """Класс для указания полей модели Job, отображаемых в админке."""
+
+    list_display = (
+        'name',
+        'key',
+        'status',
+        'attempts',
+        'run_after',
+        'finished_at'
+    )
+    list_filter = ('status', 'name')
 
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Category, CategoryAdmin)
-admin.site.register(Location)
-admin.site.register(Comment)
+admin.site.register(Location, LocationAdmin)
+admin.site.register(Comment, CommentAdmin)
+admin.site.register(Job, JobAdmin)
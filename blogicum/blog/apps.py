@@ -1,7 +1,16 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
     verbose_name = 'Блог'
+
+    def ready(self):
+        # images регистрирует обработчики фоновых задач.
+        from . import db, images, signals  # noqa: F401
+
+        if settings.BLOG_WARMUP_ON_START:
+            from .warmup import warm_up
+            warm_up()
@@ -0,0 +1,380 @@
+"""Модуль кэширования страниц и фрагментов приложения blog.
+
+Каждая кэшируемая страница относится к одной или нескольким группам
+(лента, категория, профиль, пост). У группы есть версия, которая входит
+в ключ страницы; смена версии делает недоступными все страницы группы
+без перебора ключей кэша. Версия начинается со времени ее смены,
+по которому вычисляется Last-Modified страниц группы.
+"""
+
+import hashlib
+import math
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .models import Post, publication_boundary
+
+INDEX_GROUP = 'index'
+NEXT_PUBLICATION_KEY = 'blog:next_publication'
+# Заголовки, которые вычисляются заново для каждого запроса.
+UNCACHED_HEADERS = {'etag', 'last-modified', 'set-cookie'}
+# Категории и местоположения выводятся на всех страницах постов,
+# поэтому их изменение сбрасывает эту группу, а не группы постов.
+CATALOG_GROUP = 'catalog'
+
+
+def category_group(slug):
+    """Отдает группу страниц категории."""
+    return f'category:{slug}'
+
+
+def profile_group(username):
+    """Отдает группу страниц профиля."""
+    return f'profile:{username}'
+
+
+def post_group(pk):
+    """Отдает группу страниц поста."""
+    return f'post:{pk}'
+
+
+def _version_key(group):
+    return f'blog:version:{group}'
+
+
+def _new_version():
+    return f'{int(time.time())}-{uuid4().hex}'
+
+
+def versions_changed_at(versions):
+    """Отдает время последней смены из перечисленных версий групп."""
+    timestamps = [
+        int(version.split('-', 1)[0]) for version in versions
+        if '-' in version
+    ]
+    if not timestamps:
+        return None
+    return datetime.fromtimestamp(max(timestamps), tz=timezone.utc)
+
+
+def get_group_versions(groups):
+    """Отдает текущие версии групп, создавая недостающие."""
+    keys = [_version_key(group) for group in groups]
+    versions = cache.get_many(keys)
+    missing = {key: _new_version() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def invalidate_groups(groups):
+    """Сбрасывает кэш всех страниц перечисленных групп."""
+    groups = set(groups)
+    if groups:
+        cache.set_many(
+            {_version_key(group): _new_version() for group in groups},
+            timeout=None
+        )
+
+
+def post_cache_groups(pk, author_username, category_slug):
+    """Отдает группы страниц, на которых отображается пост."""
+    groups = {INDEX_GROUP, post_group(pk), profile_group(author_username)}
+    if category_slug:
+        groups.add(category_group(category_slug))
+    return groups
+
+
+def posts_cache_groups(posts):
+    """Отдает группы страниц, на которых отображаются посты из выборки."""
+    groups = set()
+    for pk, username, slug in posts.values_list(
+        'pk', 'author__username', 'category__slug'
+    ).order_by().iterator():
+        groups |= post_cache_groups(pk, username, slug)
+    return groups
+
+
+def invalidate_posts(posts):
+    """Сбрасывает кэш страниц, на которых отображаются посты из выборки."""
+    invalidate_groups(posts_cache_groups(posts))
+
+
+def next_publication():
+    """Отдает время, когда в лентах появится ближайший отложенный пост.
+
+    Значение кэшируется до этого времени; сохранение или удаление
+    поста сбрасывает его (`forget_next_publication`).
+    """
+    cached = cache.get(NEXT_PUBLICATION_KEY)
+    if cached is not None:
+        return cached[0]
+    boundary = publication_boundary()
+    pub_date = Post.objects.filter(
+        is_published=True, pub_date__gt=boundary
+    ).order_by('pub_date').values_list('pub_date', flat=True).first()
+    visible_at = None
+    if pub_date is not None:
+        # Пост виден с первой границы публикации не раньше его даты.
+        visible_at = pub_date.replace(second=0, microsecond=0)
+        if visible_at < pub_date:
+            visible_at += timedelta(minutes=1)
+    cache.set(
+        NEXT_PUBLICATION_KEY,
+        (visible_at,),
+        _seconds_until(visible_at) if visible_at else None
+    )
+    return visible_at
+
+
+def forget_next_publication():
+    cache.delete(NEXT_PUBLICATION_KEY)
+
+
+def _seconds_until(moment):
+    return math.ceil((moment - datetime.now(timezone.utc)).total_seconds())
+
+
+def page_cache_timeout(timeout):
+    """Отдает срок хранения страницы не дольше появления отложенного поста.
+
+    Граница публикации не входит в ключи страниц, поэтому страница,
+    сохраненная до появления отложенного поста, не должна его пережить.
+    """
+    visible_at = next_publication()
+    if visible_at is not None:
+        timeout = min(timeout, _seconds_until(visible_at))
+    return timeout
+
+
+class CacheStats:
+    """Класс потокобезопасных счетчиков попаданий и промахов кэша."""
+
+    def __init__(self):
+        self._counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, hit):
+        with self._lock:
+            self._counter['hits' if hit else 'misses'] += 1
+
+    def snapshot(self):
+        """Отдает текущие значения счетчиков."""
+        with self._lock:
+            return {
+                'hits': self._counter['hits'],
+                'misses': self._counter['misses'],
+            }
+
+    def reset(self):
+        with self._lock:
+            self._counter.clear()
+
+
+post_card_stats = CacheStats()
+
+
+def render_post_cards(posts):
+    """Отдает HTML карточек постов, по возможности из кэша.
+
+    Ключ фрагмента содержит версии групп поста и каталога и число
+    комментариев, поэтому карточка общая для ленты, категории и профиля
+    и устаревает вместе с постом, категориями, местоположениями
+    или комментариями. Версии и фрагменты всех карточек страницы
+    читаются из кэша двумя запросами `get_many`.
+    """
+    posts = list(posts)
+    timeout = settings.BLOG_POST_CARD_CACHE_TIMEOUT
+    if not timeout:
+        return [
+            render_to_string('includes/post_card.html', {'post': post})
+            for post in posts
+        ]
+    *versions, catalog = get_group_versions(
+        [*(post_group(post.pk) for post in posts), CATALOG_GROUP]
+    )
+    keys = [
+        f'blog:post_card:{post.pk}:{version}:{catalog}:{post.comment_count}'
+        for post, version in zip(posts, versions)
+    ]
+    cached = cache.get_many(keys)
+    missing = {}
+    cards = []
+    for post, key in zip(posts, keys):
+        html = cached.get(key)
+        post_card_stats.record(hit=html is not None)
+        if html is None:
+            html = missing[key] = render_to_string(
+                'includes/post_card.html', {'post': post}
+            )
+        cards.append(html)
+    if missing:
+        cache.set_many(missing, timeout)
+    return cards
+
+
+def page_cache_key(prefix, parts, groups):
+    """Отдает ключ страницы и текущие версии ее групп.
+
+    Ключ — хеш частей `parts` (путь, параметры) и версий групп
+    `groups`; граница публикации в него не входит, ее учитывает
+    срок хранения из `page_cache_timeout()`.
+    """
+    versions = get_group_versions(groups)
+    digest = hashlib.md5('|'.join([*parts, *versions]).encode()).hexdigest()
+    return f'blog:{prefix}:{digest}', versions
+
+
+def load_page(key):
+    """Отдает сохраненный ответ или None."""
+    cached = cache.get(key)
+    if cached is None:
+        return None
+    content, headers = cached
+    response = HttpResponse(content)
+    for header, value in headers:
+        response[header] = value
+    return response
+
+
+def store_page(key, response, timeout, uncached=UNCACHED_HEADERS):
+    """Сохраняет ответ с заголовками, кроме перечисленных в `uncached`."""
+    timeout = page_cache_timeout(timeout)
+    if timeout <= 0:
+        return
+    headers = [
+        (header, value) for header, value in response.items()
+        if header.lower() not in uncached
+    ]
+    cache.set(key, (response.content, headers), timeout)
+
+
+def conditional_response(request, etag, last_modified, versions):
+    """Отдает ответ 304 или None и метку Last-Modified страницы.
+
+    Удаление, снятие с публикации и перенос объектов не оставляют
+    следа в содержимом, поэтому Last-Modified не раньше последней
+    смены версий групп страницы. В текущей секунде возможны еще
+    изменения с тем же временем, поэтому до ее окончания метка
+    не отдается и остается только ETag.
+    """
+    last_modified = max(
+        filter(None, (last_modified, versions_changed_at(versions))),
+        default=None
+    )
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    if timestamp is not None and timestamp >= int(time.time()):
+        timestamp = None
+    return get_conditional_response(
+        request, etag=etag, last_modified=timestamp
+    ), timestamp
+
+
+def set_validators(response, etag, timestamp):
+    """Добавляет к ответу ETag и Last-Modified, если их еще нет."""
+    if timestamp and not response.has_header('Last-Modified'):
+        response['Last-Modified'] = http_date(timestamp)
+    if not response.has_header('ETag'):
+        response['ETag'] = etag
+
+
+class AnonymousPageCacheMixin:
+    """Класс кэширования страниц для анонимных пользователей.
+
+    Ключ страницы строится из пути, параметров пагинации и версий
+    групп из `get_cache_groups()`. Страница хранится вместе
+    с заголовками ответа и не дольше, чем до появления ближайшего
+    отложенного поста.
+    """
+
+    page_cache_params = ('page', 'after', 'before')
+
+    def get_cache_groups(self):
+        """Отдает группы, при изменении которых страница устаревает.
+
+        Без групп страница устаревает только по сроку хранения.
+        """
+        return ()
+
+    def get_page_cache_key(self):
+        key, _ = page_cache_key(
+            'page',
+            [
+                self.request.path,
+                *(
+                    self.request.GET.get(param, '')
+                    for param in self.page_cache_params
+                ),
+            ],
+            self.get_cache_groups()
+        )
+        return key
+
+    def dispatch(self, request, *args, **kwargs):
+        """Отдает страницу из кэша или кэширует отрисованный ответ."""
+        if (
+            request.method not in ('GET', 'HEAD')
+            or request.user.is_authenticated
+            or not settings.BLOG_PAGE_CACHE_TIMEOUT
+        ):
+            return super().dispatch(request, *args, **kwargs)
+        key = self.get_page_cache_key()
+        response = load_page(key)
+        if response is not None:
+            return response
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            def store(response):
+                store_page(key, response, settings.BLOG_PAGE_CACHE_TIMEOUT)
+            if hasattr(response, 'add_post_render_callback'):
+                response.add_post_render_callback(store)
+            else:
+                store(response)
+        return response
+
+
+class ConditionalGetMixin:
+    """Класс поддержки условных GET-запросов (ETag и Last-Modified).
+
+    Состояние страницы вычисляется небольшим запросом
+    в `get_modification_state()` представления, который отдает время
+    последнего изменения и отпечаток содержимого, поэтому ответ 304
+    отдается без отрисовки шаблона. Last-Modified учитывает смену
+    версий групп страницы (`conditional_response`).
+    """
+
+    def get_etag(self, fingerprint, versions):
+        parts = [
+            self.request.get_full_path(),
+            str(self.request.user.pk),
+            *map(str, fingerprint),
+            *versions,
+        ]
+        return f'"{hashlib.md5("|".join(parts).encode()).hexdigest()}"'
+
+    def dispatch(self, request, *args, **kwargs):
+        """Отдает 304, если содержимое страницы не менялось."""
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        last_modified, fingerprint = self.get_modification_state()
+        versions = get_group_versions(self.get_cache_groups())
+        etag = self.get_etag(fingerprint, versions)
+        response, timestamp = conditional_response(
+            request, etag, last_modified, versions
+        )
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code == 200:
+                set_validators(response, etag, timestamp)
+        return response
@@ -0,0 +1,69 @@
+"""Модуль приближенного подсчета строк в больших выборках.
+
+Точный `COUNT(*)` по выборке с соединениями растет вместе с таблицей.
+Пока выборка не больше `BLOG_EXACT_COUNT_THRESHOLD` строк, число
+считается точно запросом с LIMIT, стоимость которого ограничена
+порогом. Выше порога используется оценка планировщика (PostgreSQL),
+а если ее нет (SQLite), — точное число, сохраненное в кэше
+и пересчитываемое не чаще раза в `BLOG_COUNT_SAMPLE_INTERVAL` секунд.
+"""
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+
+def bounded_count(queryset, limit):
+    """Отдает число строк выборки, но не больше `limit`."""
+    return queryset.order_by()[:limit].count()
+
+
+def planner_estimate(queryset):
+    """Отдает оценку числа строк от планировщика или None.
+
+    SQLite не оценивает число строк отфильтрованной выборки,
+    поэтому оценка есть только для PostgreSQL.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    # QuerySet.explain() склеивает строки плана через str(), а psycopg2
+    # уже разбирает колонку json, поэтому план читается курсором.
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def sampled_count(queryset, key):
+    """Отдает точное число строк, пересчитывая его периодически."""
+    digest = hashlib.md5(key.encode()).hexdigest()
+    cache_key = f'blog:count:sample:{digest}'
+    count = cache.get(cache_key)
+    if count is None:
+        count = queryset.order_by().count()
+        cache.set(cache_key, count, settings.BLOG_COUNT_SAMPLE_INTERVAL)
+    return count
+
+
+def approximate_count(queryset, key=None):
+    """Отдает точное число строк ниже порога и оценку выше него.
+
+    `key` определяет, какие выборки делят сохраненный пересчет;
+    по умолчанию это текст запроса.
+    """
+    threshold = settings.BLOG_EXACT_COUNT_THRESHOLD
+    count = bounded_count(queryset, threshold + 1)
+    if count <= threshold:
+        return count
+    estimate = planner_estimate(queryset)
+    if estimate is not None:
+        # Оценка ниже порога заведомо неточна: число строк уже больше.
+        return max(estimate, count)
+    return sampled_count(queryset, key or str(queryset.query))
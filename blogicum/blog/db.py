@@ -0,0 +1,30 @@
+"""Модуль настройки соединений с базой данных."""
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# Настройки, которые записываются в файл базы, а не в соединение.
+PERSISTENT_PRAGMAS = {'journal_mode'}
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """Применяет `SQLITE_PRAGMAS` к каждому новому соединению SQLite.
+
+    Режим WAL позволяет читателям работать параллельно с писателем,
+    а busy_timeout заставляет соединение ждать блокировку вместо
+    немедленной ошибки `database is locked`. Реплики из
+    `DATABASE_REPLICAS` только читаются, поэтому настройки файла
+    базы (`PERSISTENT_PRAGMAS`) к ним не применяются: режим журнала
+    реплики задает тот, кто ее обновляет.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    replica = connection.alias in settings.DATABASE_REPLICAS
+    # Выполняются в обход обработчиков курсора Django, чтобы
+    # не попадать в учет запросов страницы (QueryBudgetMiddleware).
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        if replica and name in PERSISTENT_PRAGMAS:
+            continue
+        connection.connection.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,185 @@
+"""Модуль RSS- и Atom-лент публикаций приложения blog."""
+
+import hashlib
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import parse_http_date
+
+from .caching import (CATALOG_GROUP, INDEX_GROUP, UNCACHED_HEADERS,
+                      category_group, conditional_response, load_page,
+                      page_cache_key, profile_group, set_validators,
+                      store_page)
+from .models import Category, Post, User
+from .views import posts_filtering_ordering
+
+# Колонки, нужные для элементов ленты; текст поста — самая тяжелая.
+FEED_FIELDS = (
+    'title', 'text', 'pub_date', 'updated_at',
+    'author__username', 'category__title',
+)
+
+
+class CachedFeed(Feed):
+    """Класс ленты с кэшированием и условными GET-запросами.
+
+    Лента кэшируется, как страницы `AnonymousPageCacheMixin`: ключ
+    строится из пути и версий групп из `get_cache_groups()`, а срок
+    хранения не дольше появления отложенного поста. ETag — хеш
+    содержимого ленты, поэтому после смены версии группы без изменения
+    самой ленты клиент по-прежнему получает 304. Ответ 304 и лента
+    из кэша отдаются без запросов к базе данных.
+    """
+
+    # Last-Modified ленты хранится вместе с ней и уточняется
+    # по версиям групп при каждом запросе.
+    uncached_headers = UNCACHED_HEADERS - {'last-modified'}
+
+    def get_cache_groups(self, **kwargs):
+        """Отдает группы, при изменении которых лента устаревает.
+
+        Без групп лента устаревает только по сроку хранения.
+        """
+        return ()
+
+    def __call__(self, request, *args, **kwargs):
+        key, versions = page_cache_key(
+            'feed', [request.path], self.get_cache_groups(**kwargs)
+        )
+        response = load_page(key)
+        if response is None:
+            response = super().__call__(request, *args, **kwargs)
+            store_page(
+                key, response, settings.BLOG_FEED_CACHE_TIMEOUT,
+                uncached=self.uncached_headers
+            )
+        last_modified = None
+        if response.has_header('Last-Modified'):
+            last_modified = datetime.fromtimestamp(
+                parse_http_date(response['Last-Modified']), tz=timezone.utc
+            )
+            del response['Last-Modified']
+        etag = f'"{hashlib.md5(response.content).hexdigest()}"'
+        not_modified, timestamp = conditional_response(
+            request, etag, last_modified, versions
+        )
+        if not_modified is not None:
+            return not_modified
+        set_validators(response, etag, timestamp)
+        return response
+
+    def filter_items(self, posts):
+        """Отдает опубликованные посты ленты только с нужными колонками."""
+        return posts_filtering_ordering(posts).select_related(
+            None
+        ).select_related('author', 'category').only(
+            *FEED_FIELDS
+        )[:settings.BLOG_FEED_ITEMS]
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse('blog:post_detail', args=[item.pk])
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_author_name(self, item):
+        return item.author.username
+
+    def item_categories(self, item):
+        return (item.category.title,)
+
+
+class LatestPostsFeed(CachedFeed):
+    """Класс RSS-ленты всех публикаций."""
+
+    title = 'Блогикум'
+    description = 'Новые публикации Блогикума.'
+
+    def get_cache_groups(self, **kwargs):
+        return [INDEX_GROUP, CATALOG_GROUP]
+
+    def link(self):
+        return reverse('blog:index')
+
+    def items(self):
+        return self.filter_items(Post.objects)
+
+
+class CategoryPostsFeed(CachedFeed):
+    """Класс RSS-ленты публикаций категории."""
+
+    def get_cache_groups(self, category_slug, **kwargs):
+        return [category_group(category_slug), CATALOG_GROUP]
+
+    def get_object(self, request, category_slug):
+        return get_object_or_404(
+            Category.objects.filter(is_published=True), slug=category_slug
+        )
+
+    def title(self, obj):
+        return f'Блогикум: {obj.title}'
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse('blog:category_posts', args=[obj.slug])
+
+    def items(self, obj):
+        return self.filter_items(obj.posts)
+
+
+class UserPostsFeed(CachedFeed):
+    """Класс RSS-ленты публикаций автора."""
+
+    def get_cache_groups(self, username, **kwargs):
+        return [profile_group(username), CATALOG_GROUP]
+
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, obj):
+        return f'Блогикум: публикации {obj.username}'
+
+    def description(self, obj):
+        return f'Новые публикации пользователя {obj.username}.'
+
+    def link(self, obj):
+        return reverse('blog:profile', args=[obj.username])
+
+    def items(self, obj):
+        return self.filter_items(obj.posts)
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    """Класс Atom-ленты всех публикаций."""
+
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class CategoryPostsAtomFeed(CategoryPostsFeed):
+    """Класс Atom-ленты публикаций категории."""
+
+    feed_type = Atom1Feed
+    subtitle = CategoryPostsFeed.description
+
+
+class UserPostsAtomFeed(UserPostsFeed):
+    """Класс Atom-ленты публикаций автора."""
+
+    feed_type = Atom1Feed
+    subtitle = UserPostsFeed.description
@@ -1,10 +1,32 @@
 """Модуль, с определением форм приложения blog."""
 
 from django import forms
+from PIL import Image
 
 from .models import Comment, Post, User
 
 
+class UploadedImageField(forms.ImageField):
+    """Класс поля изображения, проверенного при загрузке.
+
+    Файл, принятый `uploads.LimitedImageUploadHandler`, уже проверен
+    по заголовку, поэтому повторно Pillow не открывается; причина
+    отказа в отклоненном файле выводится как ошибка поля.
+    """
+
+    def to_python(self, data):
+        error = getattr(data, 'upload_error', None)
+        if error:
+            raise forms.ValidationError(error, code='invalid_image')
+        image_format = getattr(data, 'image_format', None)
+        if image_format is None:
+            return super().to_python(data)
+        data = forms.FileField.to_python(self, data)
+        if data is not None:
+            data.content_type = Image.MIME.get(image_format)
+        return data
+
+
 class PostForm(forms.ModelForm):
     """Класс формы поста."""
 
@@ -13,6 +35,7 @@ class PostForm(forms.ModelForm):
 
         model = Post
         exclude = ('author', )
+        field_classes = {'image': UploadedImageField}
         widgets = {
             'pub_date': forms.DateInput(attrs={'type': 'date'})
         }
@@ -0,0 +1,172 @@
+"""Модуль подготовки уменьшенных копий изображений постов."""
+
+import os
+import re
+import time
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from .caching import invalidate_posts
+from .jobs import job
+from .models import Post
+from .storage import post_image_storage
+
+WEBP = 'WEBP'
+EXTENSIONS = {'JPEG': 'jpg', 'PNG': 'png', WEBP: 'webp'}
+# Имя оригинала в хранилище: SHA-256 содержимого и расширение.
+ORIGINAL_NAME = re.compile(r'^[0-9a-f]{64}\.\w+$')
+# Недописанные загрузки и файлы, оставшиеся от прерванной сборки.
+LEFTOVER_NAME = re.compile(r'\.[0-9a-f]{32}\.(part|trash)$')
+
+
+def _fallback_format(image):
+    """Отдает формат копии для браузеров без поддержки WebP."""
+    if image.format == 'PNG' or image.mode in ('RGBA', 'LA', 'P'):
+        return 'PNG'
+    return 'JPEG'
+
+
+def _variant_base(name):
+    return os.path.splitext(name)[0]
+
+
+def _encode(image, image_format):
+    if image_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    elif image_format != 'JPEG' and image.mode == 'P':
+        image = image.convert('RGBA')
+    buffer = BytesIO()
+    image.save(
+        buffer, image_format,
+        quality=settings.POST_IMAGE_QUALITY, optimize=True
+    )
+    return ContentFile(buffer.getvalue())
+
+
+def build_variants(image_file, storage):
+    """Сохраняет в `storage` копии изображения заданной ширины.
+
+    Для каждой ширины из `POST_IMAGE_VARIANT_WIDTHS` создаются копия
+    в исходном формате (JPEG или PNG) и копия в WebP. Изображения
+    не увеличиваются, поэтому у небольших изображений копий меньше.
+    Имена копий образованы от имени оригинала, поэтому посты
+    с одним и тем же файлом пользуются одними копиями.
+    Отдает описание копий для `Post.image_variants`.
+    """
+    with image_file.open('rb') as file:
+        image = Image.open(file)
+        image.load()
+        fallback_format = _fallback_format(image)
+        image = ImageOps.exif_transpose(image)
+    base = _variant_base(image_file.name)
+    variants = {}
+    widths = sorted(
+        settings.POST_IMAGE_VARIANT_WIDTHS.items(), key=lambda item: item[1]
+    )
+    for label, width in widths:
+        variant = image
+        if image.width > width:
+            variant = image.resize(
+                (width, max(1, round(image.height * width / image.width))),
+                Image.LANCZOS
+            )
+        names = {}
+        for image_format in (fallback_format, WEBP):
+            variant_name = f'{base}.{label}.{EXTENSIONS[image_format]}'
+            storage.delete(variant_name)
+            names[image_format] = storage.save(
+                variant_name, _encode(variant, image_format)
+            )
+        variants[label] = {
+            'width': variant.width,
+            'height': variant.height,
+            'src': names[fallback_format],
+            'webp': names[WEBP],
+        }
+        if image.width <= width:
+            # Следующие копии совпали бы с этой копией в исходном размере.
+            break
+    return variants
+
+
+def delete_variants(name, storage):
+    """Удаляет файлы копий изображения `name` с предсказуемыми именами."""
+    base = _variant_base(name)
+    for label in settings.POST_IMAGE_VARIANT_WIDTHS:
+        for extension in EXTENSIONS.values():
+            storage.delete(f'{base}.{label}.{extension}')
+
+
+def collect_images(grace=None):
+    """Удаляет изображения, на которые не ссылается ни один пост.
+
+    Удаляются только файлы, не менявшиеся дольше `grace` секунд
+    (по умолчанию `POST_IMAGE_COLLECT_GRACE`): повторная загрузка того
+    же содержимого обновляет время изменения файла, поэтому пост,
+    еще не сохраненный с этим файлом, его не потеряет.
+    Отдает число удаленных изображений.
+    """
+    if grace is None:
+        grace = settings.POST_IMAGE_COLLECT_GRACE
+    cutoff = time.time() - grace
+    root = Post._meta.get_field('image').upload_to
+    if not post_image_storage.exists(root):
+        return 0
+    return sum(
+        _collect_directory(f'{root}/{directory}', cutoff)
+        for directory in post_image_storage.listdir(root)[0]
+    )
+
+
+def _collect_directory(directory, cutoff):
+    storage = post_image_storage
+    candidates = []
+    for filename in storage.listdir(directory)[1]:
+        name = f'{directory}/{filename}'
+        if not storage.modified_before(name, cutoff):
+            continue
+        if ORIGINAL_NAME.match(filename):
+            candidates.append(name)
+        elif LEFTOVER_NAME.search(filename):
+            storage.delete(name)
+    referenced = set(
+        Post.objects.filter(image__in=candidates).values_list(
+            'image', flat=True
+        )
+    )
+    removed = 0
+    for name in candidates:
+        if name not in referenced and storage.delete_unmodified(name, cutoff):
+            removed += 1
+            # Новый файл с тем же содержимым пользуется теми же копиями.
+            if not storage.exists(name):
+                delete_variants(name, default_storage)
+    return removed
+
+
+@job('post_image_variants')
+def generate_post_image_variants(post_pk, rebuild=False):
+    """Создает копии изображения поста и сбрасывает кэш его страниц.
+
+    Если копии того же файла уже есть у другого поста, они
+    переиспользуются, пока не указан `rebuild`.
+    """
+    post = Post.objects.filter(pk=post_pk).first()
+    if post is None:
+        return
+    variants = {}
+    if post.image:
+        if not rebuild:
+            variants = Post.objects.filter(
+                image=post.image.name
+            ).exclude(pk=post_pk).exclude(image_variants={}).values_list(
+                'image_variants', flat=True
+            ).first()
+        if not variants:
+            variants = build_variants(post.image, default_storage)
+    Post.objects.filter(pk=post_pk).update(image_variants=variants)
+    invalidate_posts(Post.objects.filter(pk=post_pk))
@@ -0,0 +1,174 @@
+"""Модуль очереди фоновых задач на таблице базы данных.
+
+Задачи регистрируются декоратором `job`, ставятся в очередь
+функцией `enqueue` и выполняются командой `manage.py run_worker`.
+"""
+
+import logging
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, F, Min
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger('blog.jobs')
+
+HANDLERS = {}
+
+
+def job(name):
+    """Регистрирует функцию как обработчик задачи `name`."""
+    def decorator(func):
+        HANDLERS[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, key, **payload):
+    """Ставит задачу в очередь.
+
+    Задача с тем же ключом, еще ожидающая выполнения, не дублируется;
+    выполненная или завершившаяся ошибкой задача ставится заново,
+    а выполняемая отмечается для повтора после завершения.
+    Если `JOBS_RUN_IMMEDIATELY` включен, задача выполняется сразу.
+    """
+    if settings.JOBS_RUN_IMMEDIATELY:
+        HANDLERS[name](**payload)
+        return None
+    queued, created = Job.objects.get_or_create(
+        key=key, defaults={'name': name, 'payload': payload}
+    )
+    if created:
+        return queued
+    same = Job.objects.filter(pk=queued.pk)
+    # Статус выполняемой задачи не трогается: воркер поставит ее
+    # в очередь заново, когда закончит, уже с новыми данными.
+    if same.filter(status=Job.Status.RUNNING).update(
+        name=name, payload=payload, rerun=True
+    ):
+        return queued
+    same.filter(status__in=(Job.Status.DONE, Job.Status.FAILED)).update(
+        name=name,
+        payload=payload,
+        status=Job.Status.PENDING,
+        attempts=0,
+        run_after=timezone.now(),
+        last_error='',
+        rerun=False
+    )
+    return queued
+
+
+def claim_jobs(limit):
+    """Забирает в работу до `limit` готовых к выполнению задач.
+
+    Задача считается взятой, только если условный UPDATE изменил
+    ее статус, поэтому несколько воркеров не выполнят ее дважды.
+    Зависшие задачи возвращаются в очередь, пока не исчерпаны попытки.
+    """
+    now = timezone.now()
+    stale = Job.objects.filter(
+        status=Job.Status.RUNNING,
+        locked_at__lt=now - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT)
+    )
+    stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.Status.FAILED,
+        finished_at=now,
+        last_error='Превышено время выполнения.'
+    )
+    stale.update(status=Job.Status.PENDING)
+    candidates = Job.objects.filter(
+        status=Job.Status.PENDING, run_after__lte=now
+    ).order_by('run_after').values_list('pk', flat=True)[:limit]
+    claimed = []
+    for pk in candidates:
+        if Job.objects.filter(pk=pk, status=Job.Status.PENDING).update(
+            status=Job.Status.RUNNING,
+            locked_at=now,
+            attempts=F('attempts') + 1
+        ):
+            claimed.append(pk)
+    return claimed
+
+
+def execute_job(pk):
+    """Выполняет задачу и отдает ее номер, ошибку и длительность."""
+    job = Job.objects.filter(pk=pk).first()
+    if job is None:
+        return pk, '', None, 0.0
+    start = time.perf_counter()
+    try:
+        HANDLERS[job.name](**job.payload)
+    except Exception:
+        return pk, job.name, traceback.format_exc(), (
+            time.perf_counter() - start
+        )
+    return pk, job.name, None, time.perf_counter() - start
+
+
+def backoff_delay(attempts):
+    """Отдает задержку перед повтором: экспоненциальный рост с пределом."""
+    return min(
+        settings.JOBS_BACKOFF_BASE * 2 ** (attempts - 1),
+        settings.JOBS_BACKOFF_MAX
+    )
+
+
+def finish_job(pk, error=None):
+    """Отмечает результат выполнения задачи.
+
+    Задача, поставленная заново во время выполнения, возвращается
+    в очередь с новым счетом попыток. Отдает новый статус задачи
+    или None, если ее больше нет среди выполняемых.
+    """
+    running = Job.objects.filter(pk=pk, status=Job.Status.RUNNING)
+    now = timezone.now()
+    if error is None and running.filter(rerun=False).update(
+        status=Job.Status.DONE, finished_at=now
+    ):
+        return Job.Status.DONE
+    if running.filter(rerun=True).update(
+        status=Job.Status.PENDING,
+        attempts=0,
+        run_after=now,
+        last_error=error or '',
+        rerun=False
+    ):
+        return Job.Status.PENDING
+    if error is None:
+        return None
+    job = running.first()
+    if job is None:
+        return None
+    logger.warning('Задача %s завершилась ошибкой:\n%s', job, error)
+    if job.attempts >= job.max_attempts:
+        running.update(
+            status=Job.Status.FAILED, finished_at=now, last_error=error
+        )
+        return Job.Status.FAILED
+    running.update(
+        status=Job.Status.PENDING,
+        run_after=now + timedelta(seconds=backoff_delay(job.attempts)),
+        last_error=error
+    )
+    return Job.Status.PENDING
+
+
+def queue_stats():
+    """Отдает число задач по статусам и возраст самой старой в очереди."""
+    stats = dict(
+        Job.objects.order_by().values_list('status').annotate(
+            total=Count('pk')
+        )
+    )
+    oldest = Job.objects.filter(status=Job.Status.PENDING).aggregate(
+        oldest=Min('run_after')
+    )['oldest']
+    stats['oldest_pending_seconds'] = (
+        max(0.0, (timezone.now() - oldest).total_seconds()) if oldest else 0.0
+    )
+    return stats
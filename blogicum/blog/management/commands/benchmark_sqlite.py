@@ -0,0 +1,143 @@
+"""Команда замера параллельного чтения и записи в SQLite."""
+
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+
+from blog.models import Comment, Post, User
+from blog.views import posts_filtering_ordering
+from .benchmark_views import percentile
+
+# Настройки SQLite по умолчанию: журнал отката и полная синхронизация.
+DEFAULT_PRAGMAS = {'journal_mode': 'delete', 'synchronous': 'full'}
+
+
+def run_client(role, path, pragmas, duration, post_ids, user_id):
+    """Выполняет чтения или записи до истечения `duration` секунд."""
+    connection.close()
+    connection.settings_dict['NAME'] = path
+    settings.SQLITE_PRAGMAS = pragmas
+    rng = random.Random()
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            if role == 'reader':
+                list(posts_filtering_ordering()[:10])
+            else:
+                Comment.objects.create(
+                    post_id=rng.choice(post_ids),
+                    author_id=user_id,
+                    text='Комментарий замера'
+                )
+        except OperationalError:
+            errors += 1
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+    connection.close()
+    return role, latencies, errors
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность параллельных чтений и записей '
+        'в SQLite с настройками по умолчанию и с SQLITE_PRAGMAS. '
+        'Замер идет на копиях базы, сама база не изменяется.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--duration', type=float, default=5.0)
+        parser.add_argument(
+            '--output', help='Файл для результатов в формате JSON.'
+        )
+
+    def handle(self, *args, readers, writers, duration, output, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Замер предназначен для SQLite.')
+        post_ids = list(
+            Post.objects.published().values_list('pk', flat=True)[:1000]
+        )
+        user_id = User.objects.values_list('pk', flat=True).first()
+        if not (post_ids and user_id):
+            raise CommandError(
+                'Нет данных для замера: запустите generate_dataset.'
+            )
+        results = {}
+        with tempfile.TemporaryDirectory() as directory:
+            for profile, pragmas in (
+                ('default', DEFAULT_PRAGMAS),
+                ('tuned', settings.SQLITE_PRAGMAS),
+            ):
+                path = os.path.join(directory, f'{profile}.sqlite3')
+                self.copy_database(path, pragmas['journal_mode'])
+                results[profile] = self.measure(
+                    path, pragmas, readers, writers, duration,
+                    post_ids, user_id
+                )
+        for profile, result in results.items():
+            self.stdout.write(
+                f'{profile:<8} '
+                f'чтений/с={result["reads_per_second"]:>9.1f} '
+                f'записей/с={result["writes_per_second"]:>8.1f} '
+                f'p95 чтения={result["read_p95_ms"]:>7.2f} мс '
+                f'p95 записи={result["write_p95_ms"]:>7.2f} мс '
+                f'ошибок={result["errors"]}'
+            )
+        if output:
+            with open(output, 'w', encoding='utf-8') as file:
+                json.dump({
+                    'readers': readers,
+                    'writers': writers,
+                    'duration': duration,
+                    'sqlite': sqlite3.sqlite_version,
+                    'results': results,
+                }, file, ensure_ascii=False, indent=2)
+
+    def copy_database(self, path, journal_mode):
+        """Копирует базу резервным копированием SQLite."""
+        connection.ensure_connection()
+        target = sqlite3.connect(path)
+        connection.connection.backup(target)
+        target.execute(f'PRAGMA journal_mode = {journal_mode}')
+        target.close()
+
+    def measure(
+        self, path, pragmas, readers, writers, duration, post_ids, user_id
+    ):
+        """Запускает читателей и писателей в отдельных процессах."""
+        # Соединения не должны наследоваться дочерними процессами.
+        connections.close_all()
+        roles = ['reader'] * readers + ['writer'] * writers
+        with ProcessPoolExecutor(max_workers=len(roles)) as pool:
+            futures = [
+                pool.submit(
+                    run_client, role, path, pragmas, duration,
+                    post_ids, user_id
+                )
+                for role in roles
+            ]
+            outcomes = [future.result() for future in futures]
+        latencies = {'reader': [], 'writer': []}
+        errors = 0
+        for role, role_latencies, role_errors in outcomes:
+            latencies[role].extend(role_latencies)
+            errors += role_errors
+        return {
+            'reads_per_second': len(latencies['reader']) / duration,
+            'writes_per_second': len(latencies['writer']) / duration,
+            'read_p95_ms': percentile(latencies['reader'] or [0], 0.95),
+            'write_p95_ms': percentile(latencies['writer'] or [0], 0.95),
+            'errors': errors,
+        }
@@ -0,0 +1,163 @@
+"""Команда замера производительности представлений blog."""
+
+import json
+import platform
+import time
+import tracemalloc
+from datetime import date
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+from blog.models import Category, Post, User
+from .generate_dataset import USERNAME_PREFIX
+
+
+def percentile(values, share):
+    """Отдает перцентиль по методу ближайшего ранга."""
+    ordered = sorted(values)
+    index = max(0, round(share * len(ordered) + 0.5) - 1)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет задержку, число SQL-запросов и память представлений '
+        'blog через тестовый клиент. Запросы на запись изменяют базу. '
+        'Страницы замеряются с отключенными кэшами страниц и карточек '
+        'и отдельно (с суффиксом _cached) — с прогретым кэшем.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument(
+            '--output', help='Файл для результатов в формате JSON.'
+        )
+        parser.add_argument(
+            '--only', nargs='*', help='Запустить только указанные сценарии.'
+        )
+
+    def handle(self, *args, iterations, warmup, output, only, **options):
+        author = User.objects.filter(
+            username__startswith=USERNAME_PREFIX, posts__isnull=False
+        ).order_by('pk').first()
+        post = Post.objects.published().filter(
+            comment_count__gt=0
+        ).order_by('-comment_count').first()
+        category = Category.objects.filter(
+            is_published=True, posts__isnull=False
+        ).order_by('pk').first()
+        if not (author and post and category):
+            raise CommandError(
+                'Нет данных для замера: запустите generate_dataset.'
+            )
+        # Середина ленты: проверка стоимости глубоких страниц.
+        deep_page = max(1, Post.objects.published().count() // 20)
+        anonymous = Client(HTTP_HOST='localhost')
+        logged_in = Client(HTTP_HOST='localhost')
+        logged_in.force_login(author)
+        scenarios = {
+            'index': (anonymous, 'get', '/', None),
+            'index_deep_page': (
+                anonymous, 'get', f'/?page={deep_page}', None
+            ),
+            'index_logged_in': (logged_in, 'get', '/', None),
+            'category': (
+                anonymous, 'get', f'/category/{category.slug}/', None
+            ),
+            'profile': (
+                logged_in, 'get', f'/profile/{author.username}/', None
+            ),
+            'post_detail': (anonymous, 'get', f'/posts/{post.pk}/', None),
+            'post_detail_logged_in': (
+                logged_in, 'get', f'/posts/{post.pk}/', None
+            ),
+            'create_post': (
+                logged_in, 'post', '/posts/create/', {
+                    'title': 'Замер',
+                    'text': 'Текст замера',
+                    'pub_date': date.today().isoformat(),
+                    'category': category.pk,
+                    'is_published': True,
+                }
+            ),
+            'edit_post': (
+                logged_in, 'post', f'/posts/{author.posts.first().pk}/edit/',
+                {
+                    'title': 'Замер',
+                    'text': 'Измененный текст замера',
+                    'pub_date': date.today().isoformat(),
+                    'category': category.pk,
+                    'is_published': True,
+                }
+            ),
+            'add_comment': (
+                logged_in, 'post', f'/posts/{post.pk}/comment/',
+                {'text': 'Комментарий замера'}
+            ),
+        }
+        if only:
+            scenarios = {
+                name: scenario for name, scenario in scenarios.items()
+                if name in only
+            }
+        results = {}
+        for name, scenario in scenarios.items():
+            with override_settings(
+                BLOG_PAGE_CACHE_TIMEOUT=None,
+                BLOG_POST_CARD_CACHE_TIMEOUT=None
+            ):
+                results[name] = self.measure(*scenario, iterations, warmup)
+            if scenario[1] == 'get':
+                results[f'{name}_cached'] = self.measure(
+                    *scenario, iterations, warmup
+                )
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:<32} p50={result["p50_ms"]:>8.2f} мс '
+                f'p95={result["p95_ms"]:>8.2f} мс '
+                f'запросов={result["queries"]:>3} '
+                f'память={result["peak_memory_kb"]:>8.1f} КБ'
+            )
+        if output:
+            report = {
+                'created_at': timezone.now().isoformat(),
+                'django': django.get_version(),
+                'python': platform.python_version(),
+                'database': connection.vendor,
+                'posts': Post.objects.count(),
+                'iterations': iterations,
+                'views': results,
+            }
+            with open(output, 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+
+    def measure(self, client, method, url, data, iterations, warmup):
+        """Замеряет сценарий: задержку, запросы и пиковую память."""
+        request = getattr(client, method)
+        for _ in range(warmup):
+            request(url, data)
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            response = request(url, data)
+            timings.append((time.perf_counter() - start) * 1000)
+        # Память и запросы замеряются отдельным прогоном,
+        # чтобы трассировка не искажала задержку.
+        tracemalloc.start()
+        with CaptureQueriesContext(connection) as queries:
+            response = request(url, data)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return {
+            'status': response.status_code,
+            'p50_ms': percentile(timings, 0.5),
+            'p95_ms': percentile(timings, 0.95),
+            'queries': len(queries.captured_queries),
+            'peak_memory_kb': peak / 1024,
+        }
@@ -0,0 +1,29 @@
+"""Команда удаления изображений, на которые не ссылаются посты."""
+
+from django.core.management.base import BaseCommand
+
+from blog.images import collect_images
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет изображения постов и их копии, на которые не ссылается '
+        'ни один пост. Запускается по расписанию.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace',
+            type=int,
+            default=None,
+            help=(
+                'Не трогать файлы, менявшиеся за это число секунд '
+                '(по умолчанию POST_IMAGE_COLLECT_GRACE).'
+            )
+        )
+
+    def handle(self, *args, grace, **options):
+        removed = collect_images(grace)
+        self.stdout.write(
+            self.style.SUCCESS(f'Удалено изображений: {removed}')
+        )
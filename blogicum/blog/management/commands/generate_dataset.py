@@ -0,0 +1,161 @@
+"""Команда генерации большого синтетического набора данных."""
+
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, router, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from blog.models import Category, Comment, Location, Post, User
+
+USERNAME_PREFIX = 'bench_user_'
+# Пароль всех сгенерированных пользователей.
+BENCH_PASSWORD = 'bench-password'
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу детерминированным синтетическим набором данных '
+        'массовыми вставками. Запускайте на отдельной базе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=50)
+        parser.add_argument('--locations', type=int, default=200)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=100000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if options['comments'] and not options['posts']:
+            raise CommandError('Комментариям нужны посты: укажите --posts.')
+        if User.objects.filter(
+            username__startswith=USERNAME_PREFIX
+        ).exists():
+            raise CommandError(
+                'Набор данных уже сгенерирован в этой базе.'
+            )
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now().replace(microsecond=0)
+        self.password_hash = make_password(BENCH_PASSWORD)
+
+        users = self.insert(User, options['users'], self.build_user)
+        categories = self.insert(
+            Category, options['categories'], self.build_category
+        )
+        locations = self.insert(
+            Location, options['locations'], self.build_location
+        )
+        posts = self.insert(
+            Post, options['posts'],
+            lambda n: self.build_post(n, users, categories, locations)
+        )
+        self.insert(
+            Comment, options['comments'],
+            lambda n: self.build_comment(n, users, posts),
+            collect_pks=False
+        )
+        # Массовые вставки не вызывают сигналы, поэтому счетчики
+        # комментариев и поисковый индекс обновляются одним проходом.
+        call_command('recount_comments', stdout=self.stdout)
+        call_command('rebuild_search_index', stdout=self.stdout)
+
+    def insert(self, model, total, build, collect_pks=True):
+        """Вставляет объекты пачками и отдает список их ключей.
+
+        Ключи не обязаны идти подряд (удаления в SQLite с AUTOINCREMENT,
+        последовательности PostgreSQL), поэтому они читаются из
+        результата `bulk_create`, если база их возвращает, или запросом
+        строк, добавленных пачкой после прежнего наибольшего ключа.
+        Без `collect_pks` (объекты, на которые ничто не ссылается)
+        ключи не читаются и отдается пустой список.
+        """
+        returns_pks = connections[
+            router.db_for_write(model)
+        ].features.can_return_rows_from_bulk_insert
+        reads_pks = collect_pks and not returns_pks
+        pks = []
+        for start in range(0, total, self.batch_size):
+            with transaction.atomic():
+                last_pk = (
+                    model.objects.aggregate(last=Max('pk'))['last']
+                    if reads_pks else None
+                )
+                created = model.objects.bulk_create(
+                    [
+                        build(n) for n in range(
+                            start, min(start + self.batch_size, total)
+                        )
+                    ],
+                    batch_size=self.batch_size
+                )
+                if reads_pks:
+                    pks.extend(
+                        model.objects.filter(
+                            pk__gt=last_pk or 0
+                        ).order_by('pk').values_list('pk', flat=True)
+                    )
+                elif collect_pks:
+                    pks.extend(obj.pk for obj in created)
+            self.stdout.write(
+                f'{model._meta.verbose_name_plural}: '
+                f'{min(start + self.batch_size, total)}/{total}'
+            )
+        return pks
+
+    def build_user(self, n):
+        return User(
+            username=f'{USERNAME_PREFIX}{n}',
+            email=f'{USERNAME_PREFIX}{n}@example.com',
+            password=self.password_hash
+        )
+
+    def build_category(self, n):
+        return Category(
+            title=f'Категория {n}',
+            description=f'Описание категории {n}',
+            slug=f'bench-category-{n}',
+            is_published=self.rng.random() > 0.05
+        )
+
+    def build_location(self, n):
+        return Location(
+            name=f'Место {n}',
+            is_published=self.rng.random() > 0.05
+        )
+
+    def build_text(self, words):
+        return ' '.join(
+            f'слово{self.rng.randrange(5000)}' for _ in range(words)
+        )
+
+    def build_post(self, n, users, categories, locations):
+        # Небольшая доля постов запланирована на будущее.
+        offset = timedelta(minutes=self.rng.randrange(-525600, 1440))
+        return Post(
+            title=f'Пост {n}: {self.build_text(4)}',
+            text=self.build_text(self.rng.randrange(20, 300)),
+            pub_date=self.now + offset,
+            author_id=self.rng.choice(users),
+            category_id=self.rng.choice(categories),
+            location_id=(
+                self.rng.choice(locations)
+                if self.rng.random() > 0.3 else None
+            ),
+            is_published=self.rng.random() > 0.05
+        )
+
+    def build_comment(self, n, users, posts):
+        return Comment(
+            text=self.build_text(self.rng.randrange(3, 60)),
+            # Степенное распределение дает несколько «вирусных» постов.
+            post_id=posts[int(len(posts) * self.rng.random() ** 4)],
+            author_id=self.rng.choice(users)
+        )
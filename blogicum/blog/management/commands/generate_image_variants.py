@@ -0,0 +1,29 @@
+"""Команда создания уменьшенных копий изображений постов."""
+
+from django.core.management.base import BaseCommand
+
+from blog.images import generate_post_image_variants
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Создает уменьшенные копии изображений постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Пересоздать копии и для постов, у которых они уже есть.'
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='')
+        if not options['all']:
+            posts = posts.filter(image_variants={})
+        total = 0
+        for pk in posts.values_list('pk', flat=True).iterator():
+            generate_post_image_variants(pk, rebuild=options['all'])
+            total += 1
+        self.stdout.write(
+            self.style.SUCCESS(f'Обработано изображений: {total}')
+        )
@@ -0,0 +1,18 @@
+"""Команда перестроения поискового индекса постов."""
+
+from django.core.management.base import BaseCommand
+
+from blog.search import get_search_index
+
+
+class Command(BaseCommand):
+    help = 'Строит поисковый индекс постов заново.'
+
+    def handle(self, *args, **options):
+        index = get_search_index()
+        index.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Поисковый индекс перестроен: {type(index).__name__}'
+            )
+        )
@@ -0,0 +1,32 @@
+"""Команда пересчета счетчиков комментариев постов."""
+
+from django.core.management.base import BaseCommand
+
+from blog.models import Post, comment_count_subquery
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает и исправляет счетчики комментариев постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Количество постов, обновляемых одним запросом.'
+        )
+
+    def handle(self, *args, batch_size, **options):
+        last_pk = Post.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first() or 0
+        repaired = 0
+        for start in range(0, last_pk + 1, batch_size):
+            repaired += Post.objects.filter(
+                pk__gte=start, pk__lt=start + batch_size
+            ).exclude(
+                comment_count=comment_count_subquery()
+            ).update(comment_count=comment_count_subquery())
+        self.stdout.write(
+            self.style.SUCCESS(f'Исправлено счетчиков: {repaired}')
+        )
@@ -0,0 +1,123 @@
+"""Команда запуска воркера фоновых задач."""
+
+import json
+import signal
+import time
+import traceback
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from blog.jobs import claim_jobs, execute_job, finish_job, queue_stats
+from blog.models import Job
+
+
+def _init_process():
+    """Готовит дочерний процесс: Django и собственные соединения с БД."""
+    django.setup()
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди в пуле процессов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=2,
+            help='Размер пула; 0 — выполнять задачи в текущем процессе.'
+        )
+        parser.add_argument('--poll-interval', type=float, default=1.0)
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Выполнить готовые задачи и завершиться.'
+        )
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            help='Вывести состояние очереди и завершиться.'
+        )
+
+    def handle(self, *args, processes, poll_interval, once, stats, **options):
+        if stats:
+            self.stdout.write(json.dumps(queue_stats()))
+            return
+        self.metrics = Counter()
+        self.durations = defaultdict(float)
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        pool = self.create_pool(processes) if processes else None
+        try:
+            while not self.stopping:
+                claimed = claim_jobs(max(processes, 1) * 2)
+                if pool:
+                    results, broken = self.run_in_pool(pool, claimed)
+                    if broken:
+                        pool.shutdown(wait=False)
+                        pool = self.create_pool(processes)
+                else:
+                    results = [execute_job(pk) for pk in claimed]
+                for result in results:
+                    self.record(*result)
+                if once and not claimed:
+                    break
+                if not claimed:
+                    time.sleep(poll_interval)
+        finally:
+            if pool:
+                pool.shutdown()
+            self.report()
+
+    def create_pool(self, processes):
+        # Соединения не должны наследоваться дочерними процессами.
+        connections.close_all()
+        return ProcessPoolExecutor(
+            max_workers=processes, initializer=_init_process
+        )
+
+    def run_in_pool(self, pool, claimed):
+        """Выполняет задачи в пуле и сообщает, сломался ли пул.
+
+        Если дочерний процесс аварийно завершился, пул больше
+        не принимает задачи, а все незавершенные задачи получают
+        ошибку и уходят на повтор по обычным правилам.
+        """
+        futures = {pk: pool.submit(execute_job, pk) for pk in claimed}
+        wait(futures.values())
+        results = []
+        broken = False
+        for pk, future in futures.items():
+            try:
+                results.append(future.result())
+            except BrokenProcessPool:
+                broken = True
+                results.append((pk, '', traceback.format_exc(), 0.0))
+        return results, broken
+
+    def stop(self, signum, frame):
+        self.stopping = True
+
+    def record(self, pk, name, error, duration):
+        status = finish_job(pk, error)
+        self.metrics['processed'] += 1
+        self.metrics[{
+            Job.Status.DONE: 'succeeded',
+            Job.Status.PENDING: 'retried',
+            Job.Status.FAILED: 'failed',
+        }.get(status, 'skipped')] += 1
+        if name:
+            self.durations[name] += duration
+
+    def report(self):
+        self.stdout.write(json.dumps({
+            **self.metrics,
+            'seconds_by_job': dict(self.durations),
+            'queue': queue_stats(),
+        }, ensure_ascii=False))
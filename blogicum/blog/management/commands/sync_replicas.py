@@ -0,0 +1,37 @@
+"""Команда копирования основной базы SQLite в файлы реплик."""
+
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в реплики из DATABASE_REPLICAS '
+        'резервным копированием SQLite. Заменяет репликацию при '
+        'локальной проверке blog.routers.ReplicaRouter.'
+    )
+
+    def handle(self, *args, **options):
+        primary = connections[DEFAULT_DB_ALIAS]
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError(
+                'Реплики не настроены: задайте BLOGICUM_SQLITE_REPLICAS.'
+            )
+        vendors = {primary.vendor} | {
+            connections[alias].vendor for alias in settings.DATABASE_REPLICAS
+        }
+        if vendors != {'sqlite'}:
+            raise CommandError(
+                'Копирование поддерживается только между базами SQLite.'
+            )
+        primary.ensure_connection()
+        for alias in settings.DATABASE_REPLICAS:
+            replica = connections[alias]
+            replica.close()
+            target = sqlite3.connect(replica.settings_dict['NAME'])
+            primary.connection.backup(target)
+            target.close()
+            self.stdout.write(f'{alias}: {replica.settings_dict["NAME"]}')
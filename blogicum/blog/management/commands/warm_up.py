@@ -0,0 +1,21 @@
+"""Команда прогрева шаблонов и маршрутов."""
+
+from django.core.management.base import BaseCommand
+
+from blog.warmup import warm_up
+
+
+class Command(BaseCommand):
+    help = (
+        'Компилирует все шаблоны из каталога templates/ и обращает '
+        'маршруты blog: и pages:, сообщая о найденных ошибках.'
+    )
+
+    def handle(self, *args, **options):
+        templates, urls, duration = warm_up()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Шаблонов: {len(templates)}, маршрутов: {len(urls)}, '
+                f'время: {duration * 1000:.0f} мс'
+            )
+        )
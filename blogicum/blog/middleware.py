@@ -0,0 +1,146 @@
+"""Модуль с промежуточными слоями приложения blog."""
+
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .routers import finish_request, start_request
+
+logger = logging.getLogger('blog.queries')
+
+
+class QueryRecorder:
+    """Класс записи SQL-запросов, выполненных за время запроса."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            # Параметры передаются отдельно, поэтому текст запроса
+            # с плейсхолдерами и есть его «форма».
+            self.shapes[sql] += 1
+
+    def repeated_shapes(self, threshold):
+        """Отдает формы запросов, повторившиеся не меньше `threshold` раз."""
+        return {
+            sql: count for sql, count in self.shapes.items()
+            if count >= threshold
+        }
+
+
+class QueryBudgetMiddleware:
+    """Класс учета SQL-запросов каждого запроса к сайту.
+
+    Считает число и время запросов, отдает их в заголовке
+    `Server-Timing`, пишет в лог превышения бюджетов
+    из `QUERY_BUDGETS` (по имени маршрута) и повторяющиеся
+    формы запросов, характерные для проблемы N+1.
+
+    У потоковых ответов запросы считаются и во время отдачи тела:
+    заголовок содержит только запросы до начала отдачи, а бюджет
+    проверяется после нее по всем запросам.
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_BUDGET_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with self.recording(recorder):
+            response = self.get_response(request)
+        response['Server-Timing'] = (
+            f'db;dur={recorder.duration * 1000:.1f};'
+            f'desc="{recorder.count} queries"'
+        )
+        if response.streaming:
+            response.streaming_content = self.record_stream(
+                request, recorder, response.streaming_content
+            )
+        else:
+            self.check_budget(request, recorder)
+        return response
+
+    @staticmethod
+    @contextmanager
+    def recording(recorder):
+        """Подключает `recorder` ко всем соединениям с базами."""
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(
+                    connections[alias].execute_wrapper(recorder)
+                )
+            yield
+
+    def record_stream(self, request, recorder, content):
+        """Отдает тело потокового ответа, продолжая учет запросов."""
+        with self.recording(recorder):
+            yield from content
+        self.check_budget(request, recorder)
+
+    def check_budget(self, request, recorder):
+        match = request.resolver_match
+        view_name = match.view_name if match else request.path
+        budget = settings.QUERY_BUDGETS.get(
+            view_name, settings.QUERY_BUDGET_DEFAULT
+        )
+        if budget is not None and recorder.count > budget:
+            logger.warning(
+                'Превышен бюджет запросов %s: %d из %d (%.1f мс).',
+                view_name, recorder.count, budget, recorder.duration * 1000
+            )
+        repeated = recorder.repeated_shapes(
+            settings.QUERY_REPEAT_THRESHOLD
+        )
+        for sql, count in repeated.items():
+            logger.warning(
+                'Возможная проблема N+1 в %s: запрос выполнен %d раз: %s',
+                view_name, count, sql
+            )
+
+
+class PrimaryPinMiddleware:
+    """Класс закрепления клиента за основной базой после записи.
+
+    Если запрос выполнил запись в модели blog, клиенту ставится
+    cookie на `REPLICA_PIN_SECONDS`: пока она действует,
+    `routers.ReplicaRouter` читает для него из основной базы,
+    и отставание реплик не скрывает только что созданные объекты.
+    """
+
+    cookie_name = 'primary_pin'
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = start_request(pinned=self.cookie_name in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = finish_request(token)
+        if wrote:
+            response.set_cookie(
+                self.cookie_name,
+                '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax'
+            )
+        return response
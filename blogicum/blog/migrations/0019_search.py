@@ -0,0 +1,89 @@
+# Generated by Django 3.2.16 on 2026-10-17 04:17
+
+import re
+from collections import Counter
+
+from django.db import OperationalError, migrations, models
+import django.db.models.deletion
+
+FTS_TABLE = 'blog_post_fts'
+# Копия токенизатора blog.search на момент миграции: миграция
+# не должна зависеть от того, как код поиска изменится позже.
+TOKEN_RE = re.compile(r'[^\W_]+')
+TERM_MAX_LENGTH = 64
+TITLE_WEIGHT = 10
+
+
+def tokenize(text):
+    return [
+        token[:TERM_MAX_LENGTH] for token in TOKEN_RE.findall(text.casefold())
+    ]
+
+
+def term_weights(title, text):
+    weights = Counter(tokenize(text))
+    for term in tokenize(title):
+        weights[term] += TITLE_WEIGHT
+    return weights
+
+
+def create_search_index(apps, schema_editor):
+    """Создает таблицу FTS5 или заполняет обратный индекс."""
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5('
+                    'title, text, tokenize="unicode61 remove_diacritics 0")'
+                )
+                cursor.execute(
+                    f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+                    'SELECT id, title, text FROM blog_post'
+                )
+            return
+        except OperationalError:
+            # SQLite собран без FTS5: используется обратный индекс.
+            pass
+    Post = apps.get_model('blog', 'Post')
+    SearchTerm = apps.get_model('blog', 'SearchTerm')
+    for pk, title, text in Post.objects.values_list(
+        'pk', 'title', 'text'
+    ).iterator():
+        SearchTerm.objects.bulk_create(
+            SearchTerm(term=term, post_id=pk, weight=weight)
+            for term, weight in term_weights(title, text).items()
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0018_post_image_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64, verbose_name='Слово')),
+                ('weight', models.PositiveIntegerField(verbose_name='Вес')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='blog.post', verbose_name='пост')),
+            ],
+            options={
+                'verbose_name': 'слово поискового индекса',
+                'verbose_name_plural': 'Поисковый индекс',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='searchterm',
+            constraint=models.UniqueConstraint(fields=('term', 'post'), name='search_term_post_unique'),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-17 04:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0020_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='rerun',
+            field=models.BooleanField(default=False, help_text='Задача поставлена заново во время выполнения.', verbose_name='Запустить повторно'),
+        ),
+    ]
@@ -1,7 +1,12 @@
 """Модуль для создания и описания моделей проекта."""
 
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
 from django.db import models
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .storage import post_image_storage
 
 User = get_user_model()
 # Произвольное значение для усечения длины
@@ -71,13 +76,44 @@ class Location(PubCheckAndCreationTimeModel):
         return self.name[:OBJECT_NAME_MAX_LENGHT]
 
 
+def publication_boundary():
+    """Отдает текущее время, округленное вниз до минуты.
+
+    Граница одинакова для всех запросов в пределах минуты, поэтому
+    ее можно использовать в ключах кэша, а отложенные посты появляются
+    в лентах не позже чем через минуту после наступления даты.
+    """
+    return timezone.now().replace(second=0, microsecond=0)
+
+
+class PostQuerySet(models.QuerySet):
+    """Класс набора запросов для постов."""
+
+    def published(self, now=None):
+        """Отдает опубликованные посты с наступившей датой публикации.
+
+        Граница сравнивается с самим полем `pub_date` без приведения
+        к дате, чтобы запрос мог использовать составные индексы.
+        """
+        return self.filter(
+            pub_date__lte=now or publication_boundary(),
+            is_published=True,
+            category__is_published=True
+        )
+
+
 class Post(PubCheckAndCreationTimeModel):
     """Класс, с описанием модели поста."""
 
     title = models.CharField(max_length=256, verbose_name='Заголовок')
     text = models.TextField(verbose_name='Текст')
     image = models.ImageField(
-        'Изображение', upload_to='post_images', blank=True)
+        'Изображение',
+        upload_to='post_images',
+        storage=post_image_storage,
+        blank=True,
+        db_index=True
+    )
     pub_date = models.DateTimeField(
         verbose_name='Дата и время публикации',
         help_text=(
@@ -106,16 +142,78 @@ class Post(PubCheckAndCreationTimeModel):
         null=True,
         related_name='posts'
     )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено'
+    )
+    image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Уменьшенные копии изображения'
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('is_published', '-pub_date'),
+                name='post_published_pub_date_idx'
+            ),
+            models.Index(
+                fields=('category', '-pub_date'),
+                name='post_category_pub_date_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='post_author_pub_date_idx'
+            ),
+            # Сортировка и date_hierarchy в админке.
+            models.Index(fields=('-pub_date',), name='post_pub_date_idx'),
+        )
 
     def __str__(self):
         """Выводит читаемые названия объектов."""
         return self.title[:OBJECT_NAME_MAX_LENGHT]
 
+    @property
+    def image_sources(self):
+        """Отдает атрибуты src и srcset уменьшенных копий изображения."""
+        if not self.image or not self.image_variants:
+            return None
+        variants = sorted(
+            self.image_variants.values(), key=lambda variant: variant['width']
+        )
+        return {
+            'src': default_storage.url(variants[-1]['src']),
+            'srcset': ', '.join(
+                f'{default_storage.url(variant["src"])} {variant["width"]}w'
+                for variant in variants
+            ),
+            'webp_srcset': ', '.join(
+                f'{default_storage.url(variant["webp"])} {variant["width"]}w'
+                for variant in variants
+            ),
+        }
+
+    def is_visible(self, now=None):
+        """Проверяет пост по тем же условиям, что и `published()`."""
+        return (
+            self.is_published
+            and self.category is not None
+            and self.category.is_published
+            and self.pub_date <= (now or publication_boundary())
+        )
+
 
 class Comment(models.Model):
     """Класс с описанием модели комментария."""
@@ -139,6 +237,11 @@ class Comment(models.Model):
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('created_at',), name='comment_created_at_idx'
+            ),
+        )
 
     def __str__(self):
         """Выводит читаемые названия объектов."""
@@ -146,3 +249,103 @@ class Comment(models.Model):
             f'Пост: {self.post.title[:OBJECT_NAME_MAX_LENGHT]}. '
             f'Текст: {self.text[:OBJECT_NAME_MAX_LENGHT]}'
         )
+
+
+def comment_count_subquery():
+    """Отдает подзапрос с фактическим числом комментариев поста."""
+    return Coalesce(
+        models.Subquery(
+            Comment.objects.filter(
+                post=models.OuterRef('pk')
+            ).order_by().values('post').annotate(
+                total=models.Count('pk')
+            ).values('total'),
+            output_field=models.IntegerField()
+        ),
+        0
+    )
+
+
+class SearchTerm(models.Model):
+    """Класс с описанием записи обратного индекса поиска по постам.
+
+    Используется, когда база данных не поддерживает SQLite FTS5.
+    """
+
+    term = models.CharField('Слово', max_length=64)
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        verbose_name='пост',
+        related_name='search_terms'
+    )
+    weight = models.PositiveIntegerField('Вес')
+
+    class Meta:
+        verbose_name = 'слово поискового индекса'
+        verbose_name_plural = 'Поисковый индекс'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('term', 'post'), name='search_term_post_unique'
+            ),
+        )
+
+    def __str__(self):
+        """Выводит читаемые названия объектов."""
+        return self.term
+
+
+class Job(models.Model):
+    """Класс с описанием модели фоновой задачи."""
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Ожидает'
+        RUNNING = 'running', 'Выполняется'
+        DONE = 'done', 'Выполнена'
+        FAILED = 'failed', 'Ошибка'
+
+    name = models.CharField('Задача', max_length=64)
+    key = models.CharField(
+        'Ключ',
+        max_length=255,
+        unique=True,
+        help_text=(
+            'Повторная постановка задачи с тем же ключом не создает дубль.'
+        )
+    )
+    payload = models.JSONField('Параметры', default=dict, blank=True)
+    status = models.CharField(
+        'Статус',
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    max_attempts = models.PositiveSmallIntegerField(
+        'Максимум попыток', default=5
+    )
+    run_after = models.DateTimeField('Запустить после', default=timezone.now)
+    locked_at = models.DateTimeField('Взята в работу', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    rerun = models.BooleanField(
+        'Запустить повторно',
+        default=False,
+        help_text='Задача поставлена заново во время выполнения.'
+    )
+    created_at = models.DateTimeField('Создана', auto_now_add=True)
+    finished_at = models.DateTimeField('Завершена', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        ordering = ('run_after',)
+        indexes = (
+            models.Index(
+                fields=('status', 'run_after'),
+                name='job_status_run_after_idx'
+            ),
+        )
+
+    def __str__(self):
+        """Выводит читаемые названия объектов."""
+        return f'{self.name} ({self.key})'
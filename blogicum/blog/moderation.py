@@ -0,0 +1,174 @@
+"""Модуль массовой модерации объектов приложения blog.
+
+Действия выполняются пакетами по `BLOG_MODERATION_BATCH_SIZE` ключей:
+каждый пакет — отдельная транзакция с одиночными UPDATE или DELETE
+на таблицу, без загрузки объектов и сигналов на каждый объект.
+Производные данные (кэш страниц, счетчики комментариев, поисковый
+индекс) обновляются сразу для всего пакета; файлы изображений
+удаленных постов убирает периодическая сборка (`images.collect_images`).
+"""
+
+import logging
+
+from django.conf import settings
+from django.db import models, router, transaction
+from django.utils import timezone
+
+from .caching import (CATALOG_GROUP, INDEX_GROUP, category_group,
+                      forget_next_publication, invalidate_groups,
+                      posts_cache_groups)
+from .models import (Category, Comment, Location, Post,
+                     comment_count_subquery)
+from .search import get_search_index
+
+logger = logging.getLogger('blog.moderation')
+
+
+def pk_batches(queryset, batch_size=None):
+    """Отдает ключи объектов выборки пакетами в порядке возрастания.
+
+    Каждый пакет выбирается заново после предыдущего ключа, поэтому
+    изменение или удаление уже обработанных строк не сбивает обход.
+    """
+    batch_size = batch_size or settings.BLOG_MODERATION_BATCH_SIZE
+    pks = queryset.order_by('pk').values_list('pk', flat=True)
+    last = None
+    while True:
+        batch = list(
+            (pks if last is None else pks.filter(pk__gt=last))[:batch_size]
+        )
+        if not batch:
+            return
+        yield batch
+        last = batch[-1]
+
+
+def run_in_batches(label, queryset, handler):
+    """Применяет `handler` к пакетам ключей выборки.
+
+    `handler` выполняется в транзакции и отдает число обработанных
+    строк и группы кэша, которые сбрасываются после фиксации.
+    Отдает общее число строк и пакетов.
+    """
+    done = batches = 0
+    for pks in pk_batches(queryset):
+        with transaction.atomic():
+            count, groups = handler(pks)
+        invalidate_groups(groups)
+        done += count
+        batches += 1
+        logger.info('%s: пакет %d, обработано %d.', label, batches, done)
+    return done, batches
+
+
+def delete_rows(model, pks):
+    """Удаляет строки и зависимые от них одним DELETE на таблицу.
+
+    Каскад Django загрузил бы каждую зависимую строку ради сигналов,
+    поэтому зависимые модели удаляются или обнуляются здесь явно.
+    Поддерживаются только CASCADE и SET_NULL и зависимые модели
+    без собственных зависимых: иначе DELETE без каскада Django
+    оставил бы висячие ссылки.
+    """
+    for relation in model._meta.related_objects:
+        if relation.on_delete not in (models.CASCADE, models.SET_NULL):
+            raise ValueError(
+                f'{relation.related_model.__name__}.{relation.field.name}: '
+                'пакетное удаление поддерживает только CASCADE и SET_NULL.'
+            )
+        if (
+            relation.on_delete is models.CASCADE
+            and relation.related_model._meta.related_objects
+        ):
+            raise ValueError(
+                f'{relation.related_model.__name__}: у зависимой модели '
+                'есть свои зависимые, пакетное удаление их не удалит.'
+            )
+    using = router.db_for_write(model)
+    for relation in model._meta.related_objects:
+        related = relation.related_model._base_manager.filter(
+            **{f'{relation.field.name}__in': pks}
+        )
+        if relation.on_delete is models.CASCADE:
+            related._raw_delete(using)
+        else:
+            related.update(**{relation.field.name: None})
+    return model._base_manager.filter(pk__in=pks)._raw_delete(using)
+
+
+def update_posts(queryset, **changes):
+    """Изменяет поля постов выборки."""
+    def handler(pks):
+        posts = Post.objects.filter(pk__in=pks)
+        groups = posts_cache_groups(posts)
+        count = posts.update(updated_at=timezone.now(), **changes)
+        forget_next_publication()
+        # Новые группы нужны при переносе постов в другую категорию.
+        return count, groups | posts_cache_groups(posts)
+
+    return run_in_batches('update_posts', queryset, handler)
+
+
+def delete_posts(queryset):
+    """Удаляет посты выборки вместе с их комментариями."""
+    def handler(pks):
+        posts = Post.objects.filter(pk__in=pks)
+        groups = posts_cache_groups(posts)
+        get_search_index().remove_many(pks)
+        forget_next_publication()
+        return delete_rows(Post, pks), groups
+
+    return run_in_batches('delete_posts', queryset, handler)
+
+
+def delete_posts_by_authors(queryset):
+    """Удаляет все посты авторов постов выборки."""
+    authors = set(queryset.values_list('author_id', flat=True).distinct())
+    return delete_posts(Post.objects.filter(author_id__in=authors))
+
+
+def delete_comments(queryset):
+    """Удаляет комментарии выборки и пересчитывает счетчики постов."""
+    def handler(pks):
+        post_ids = set(
+            Comment.objects.filter(pk__in=pks).values_list(
+                'post_id', flat=True
+            )
+        )
+        count = delete_rows(Comment, pks)
+        posts = Post.objects.filter(pk__in=post_ids)
+        posts.update(
+            comment_count=comment_count_subquery(),
+            updated_at=timezone.now()
+        )
+        return count, posts_cache_groups(posts)
+
+    return run_in_batches('delete_comments', queryset, handler)
+
+
+def delete_comments_by_authors(queryset):
+    """Удаляет все комментарии авторов комментариев выборки."""
+    authors = set(queryset.values_list('author_id', flat=True).distinct())
+    return delete_comments(Comment.objects.filter(author_id__in=authors))
+
+
+def update_categories(queryset, **changes):
+    """Изменяет поля категорий выборки."""
+    def handler(pks):
+        categories = Category.objects.filter(pk__in=pks)
+        groups = {INDEX_GROUP, CATALOG_GROUP} | {
+            category_group(slug)
+            for slug in categories.values_list('slug', flat=True)
+        }
+        return categories.update(**changes), groups
+
+    return run_in_batches('update_categories', queryset, handler)
+
+
+def update_locations(queryset, **changes):
+    """Изменяет поля местоположений выборки."""
+    def handler(pks):
+        count = Location.objects.filter(pk__in=pks).update(**changes)
+        return count, {CATALOG_GROUP}
+
+    return run_in_batches('update_locations', queryset, handler)
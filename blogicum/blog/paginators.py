@@ -0,0 +1,221 @@
+"""Модуль с пагинаторами коллекций приложения blog."""
+
+import base64
+import binascii
+import hashlib
+import json
+from collections.abc import Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from .counting import approximate_count
+
+
+class ApproximateCountPaginator(Paginator):
+    """Класс пагинации с приближенным числом объектов для больших выборок.
+
+    Число объектов считается `counting.approximate_count()`: точно
+    до порога и приближенно выше него, поэтому номер последней
+    страницы большой выборки может немного отличаться от точного.
+    `count_key` задает, какие выборки делят периодический пересчет.
+    """
+
+    def __init__(self, object_list, per_page, *args, count_key=None,
+                 **kwargs):
+        super().__init__(object_list, per_page, *args, **kwargs)
+        self.count_key = count_key
+
+    @cached_property
+    def count(self):
+        return approximate_count(self.object_list, self.count_key)
+
+
+class CachedCountPaginator(ApproximateCountPaginator):
+    """Класс пагинации с числом объектов, хранящимся в кэше.
+
+    Число объектов хранится `BLOG_PAGINATOR_COUNT_TIMEOUT` секунд
+    под ключом из `count_key` и `count_version`; вызывающий код
+    включает в версию все, от чего зависит выборка (например, версии
+    групп кэша), поэтому изменения постов сбрасывают сохраненное
+    значение.
+    """
+
+    def __init__(self, object_list, per_page, *args, count_version=None,
+                 **kwargs):
+        super().__init__(object_list, per_page, *args, **kwargs)
+        self.count_version = count_version
+
+    @cached_property
+    def count(self):
+        timeout = settings.BLOG_PAGINATOR_COUNT_TIMEOUT
+        if self.count_version is None or not timeout:
+            return super().count
+        digest = hashlib.md5(
+            f'{self.count_key}|{self.count_version}'.encode()
+        ).hexdigest()
+        key = f'blog:count:{digest}'
+        count = cache.get(key)
+        if count is None:
+            count = super().count
+            cache.set(key, count, timeout)
+        return count
+
+
+def encode_token(values):
+    """Кодирует значения курсора в непрозрачный токен."""
+    return base64.urlsafe_b64encode(
+        json.dumps(values).encode()
+    ).decode().rstrip('=')
+
+
+def decode_token(token, converters):
+    """Раскодирует токен и приводит значения функциями `converters`.
+
+    Число значений должно совпадать с числом функций; токен
+    с ошибкой вызывает `InvalidPage`.
+    """
+    try:
+        values = json.loads(
+            base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        )
+        if not isinstance(values, list) or len(values) != len(converters):
+            raise ValueError
+        return [
+            convert(value) for convert, value in zip(converters, values)
+        ]
+    except (
+        binascii.Error, UnicodeDecodeError, TypeError,
+        ValueError, ValidationError
+    ):
+        raise InvalidPage('Некорректный курсор страницы.')
+
+
+class CursorPage(Sequence):
+    """Класс страницы курсорной пагинации."""
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        """Курсор для перехода на следующую страницу."""
+        if not self._has_next:
+            return None
+        return self.paginator.encode_cursor(self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        """Курсор для перехода на предыдущую страницу."""
+        if not self._has_previous:
+            return None
+        return self.paginator.encode_cursor(self.object_list[0])
+
+
+class CursorPaginator:
+    """Класс пагинации по курсору без OFFSET и подсчета общего числа.
+
+    Страница выбирается условием по значениям полей сортировки
+    последнего (или первого) объекта соседней страницы, поэтому
+    глубина страницы не влияет на стоимость запроса, а новые объекты
+    не сдвигают уже просмотренные страницы.
+    """
+
+    def __init__(self, object_list, per_page, ordering=('-pub_date', '-id')):
+        directions = {field.startswith('-') for field in ordering}
+        if len(directions) != 1:
+            raise ValueError(
+                'Все поля сортировки курсора должны иметь одно направление.'
+            )
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.descending = directions.pop()
+        self.fields = tuple(field.lstrip('-') for field in ordering)
+
+    def _reversed_ordering(self):
+        return tuple(
+            field if self.descending else f'-{field}'
+            for field in self.fields
+        )
+
+    def encode_cursor(self, obj):
+        """Кодирует значения полей сортировки объекта в непрозрачный токен."""
+        opts = self.object_list.model._meta
+        return encode_token([
+            opts.get_field(field).value_to_string(obj)
+            for field in self.fields
+        ])
+
+    def decode_cursor(self, token):
+        """Раскодирует токен или вызывает `InvalidPage`."""
+        opts = self.object_list.model._meta
+        return decode_token(
+            token, [opts.get_field(field).to_python for field in self.fields]
+        )
+
+    def _seek(self, values, forward):
+        """Строит условие выборки объектов после (или до) курсора."""
+        lookup = 'lt' if self.descending == forward else 'gt'
+        condition = Q()
+        for index, field in enumerate(self.fields):
+            step = Q(**{f'{field}__{lookup}': values[index]})
+            for prev_field, prev_value in zip(
+                self.fields[:index], values[:index]
+            ):
+                step &= Q(**{prev_field: prev_value})
+            condition |= step
+        return condition
+
+    def page(self, after=None, before=None):
+        """Отдает страницу после курсора `after` или до курсора `before`."""
+        queryset = self.object_list
+        if before:
+            rows = list(
+                queryset.filter(
+                    self._seek(self.decode_cursor(before), forward=False)
+                ).order_by(
+                    *self._reversed_ordering()
+                )[:self.per_page + 1]
+            )
+            if len(rows) <= self.per_page:
+                # Дошли до начала ленты: отдаем первую полную страницу.
+                return self.page()
+            return CursorPage(
+                rows[:self.per_page][::-1], self,
+                has_next=True, has_previous=True
+            )
+        if after:
+            queryset = queryset.filter(
+                self._seek(self.decode_cursor(after), forward=True)
+            )
+        rows = list(
+            queryset.order_by(*self.ordering)[:self.per_page + 1]
+        )
+        return CursorPage(
+            rows[:self.per_page], self,
+            has_next=len(rows) > self.per_page,
+            has_previous=bool(after)
+        )
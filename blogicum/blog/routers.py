@@ -0,0 +1,124 @@
+"""Модуль маршрутизации запросов моделей blog между базами данных."""
+
+import logging
+import os
+import time
+from contextvars import ContextVar
+from itertools import count
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger('blog.db')
+
+# Состояние текущего запроса к сайту: прочитан ли признак закрепления
+# за основной базой и была ли запись. Вне запроса (команды, воркер)
+# состояние не задано и все запросы идут в основную базу.
+_request_state = ContextVar('blog_replica_state', default=None)
+
+
+def start_request(pinned):
+    """Начинает учет записей для запроса и отдает токен для сброса."""
+    return _request_state.set(
+        {'pinned': pinned, 'wrote': False, 'replica': None}
+    )
+
+
+def finish_request(token):
+    """Завершает учет и отдает True, если запрос выполнял запись."""
+    state = _request_state.get()
+    _request_state.reset(token)
+    return bool(state and state['wrote'])
+
+
+class ReplicaRouter:
+    """Класс маршрутизатора чтений моделей blog на реплики.
+
+    Запросы к сайту распределяются по кругу между исправными
+    репликами из `DATABASE_REPLICAS`; реплика выбирается один раз
+    на запрос, чтобы все чтения страницы видели одно состояние
+    данных. Запрос, выполнивший запись, и следующие
+    запросы того же клиента в течение `REPLICA_PIN_SECONDS`
+    (см. `middleware.PrimaryPinMiddleware`) читают из основной базы,
+    чтобы автор сразу видел свой пост или комментарий. Исправность
+    реплики проверяется не чаще раза в `REPLICA_HEALTH_CHECK_INTERVAL`
+    секунд; без исправных реплик чтения идут в основную базу.
+    """
+
+    app_label = 'blog'
+
+    def __init__(self):
+        self._counter = count()
+        self._health = {}
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label != self.app_label:
+            return None
+        state = _request_state.get()
+        if (
+            state is None
+            or state['pinned']
+            or state['wrote']
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        if state['replica'] is None:
+            state['replica'] = self.choose_replica()
+        return state['replica']
+
+    def choose_replica(self):
+        """Отдает следующую по кругу исправную реплику или основную базу."""
+        replicas = [
+            alias for alias in settings.DATABASE_REPLICAS
+            if self.is_healthy(alias)
+        ]
+        if not replicas:
+            return DEFAULT_DB_ALIAS
+        return replicas[next(self._counter) % len(replicas)]
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label != self.app_label:
+            return None
+        state = _request_state.get()
+        if state is not None:
+            state['wrote'] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def is_healthy(self, alias):
+        """Отдает исправность реплики, проверяя ее не слишком часто."""
+        now = time.monotonic()
+        checked = self._health.get(alias)
+        if checked and (
+            now - checked[1] < settings.REPLICA_HEALTH_CHECK_INTERVAL
+        ):
+            return checked[0]
+        healthy = self.check(alias)
+        if not healthy and (checked is None or checked[0]):
+            logger.warning(
+                'Реплика %s недоступна, чтения идут мимо нее.', alias
+            )
+        self._health[alias] = (healthy, now)
+        return healthy
+
+    def check(self, alias):
+        """Проверяет, что реплика отвечает на запросы."""
+        connection = connections[alias]
+        if (
+            connection.vendor == 'sqlite'
+            and not connection.is_in_memory_db()
+            and not os.path.exists(connection.settings_dict['NAME'])
+        ):
+            # SQLite создал бы пустую базу вместо отсутствующей.
+            return False
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except DatabaseError:
+            return False
+        return True
@@ -0,0 +1,263 @@
+"""Модуль полнотекстового поиска по постам.
+
+На SQLite с поддержкой FTS5 поиск идет по виртуальной таблице
+`blog_post_fts`, на остальных базах — по обратному индексу
+в таблице `SearchTerm`. Индекс обновляется сигналами при сохранении
+и удалении поста; `manage.py rebuild_search_index` строит его заново.
+"""
+
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, Count, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Cast
+
+from .counting import sampled_count
+from .models import Post, SearchTerm
+from .paginators import CursorPage, decode_token, encode_token
+
+FTS_TABLE = 'blog_post_fts'
+# Токены совпадают с токенизатором unicode61: буквы и цифры.
+TOKEN_RE = re.compile(r'[^\W_]+')
+TERM_MAX_LENGTH = SearchTerm._meta.get_field('term').max_length
+# Насыщение частоты слова в формуле BM25.
+BM25_K1 = 1.2
+
+
+def tokenize(text):
+    """Разбивает текст на слова в нижнем регистре."""
+    return [
+        token[:TERM_MAX_LENGTH] for token in TOKEN_RE.findall(text.casefold())
+    ]
+
+
+def term_weights(title, text):
+    """Отдает вес каждого слова поста с учетом веса заголовка."""
+    weights = Counter(tokenize(text))
+    for term in tokenize(title):
+        weights[term] += settings.BLOG_SEARCH_TITLE_WEIGHT
+    return weights
+
+
+class Fts5Index:
+    """Класс поискового индекса на виртуальной таблице SQLite FTS5.
+
+    Ранг — значение bm25() с весом заголовка: чем меньше, тем выше
+    пост в выдаче.
+    """
+
+    def update(self, post):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post.pk]
+            )
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+                'VALUES (%s, %s, %s)',
+                [post.pk, post.title, post.text]
+            )
+
+    def remove(self, post_pk):
+        self.remove_many([post_pk])
+
+    def remove_many(self, post_pks):
+        post_pks = list(post_pks)
+        if not post_pks:
+            return
+        placeholders = ', '.join(['%s'] * len(post_pks))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})',
+                post_pks
+            )
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+                f'SELECT id, title, text FROM {Post._meta.db_table}'
+            )
+
+    def search(self, query, after=None, limit=None):
+        """Отдает пары (ранг, id поста) по возрастанию ранга после `after`.
+
+        В пределах страницы нужны только `limit` лучших совпадений,
+        поэтому сортировка и отсечение выполняются в SQLite.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+        sql = (
+            f'SELECT bm25({FTS_TABLE}, %s, 1.0) AS score, rowid AS post_id '
+            f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s'
+        )
+        params = [
+            float(settings.BLOG_SEARCH_TITLE_WEIGHT),
+            ' '.join(f'"{term}"' for term in terms)
+        ]
+        sql = f'SELECT score, post_id FROM ({sql})'
+        if after:
+            sql += ' WHERE score > %s OR (score = %s AND post_id > %s)'
+            params += [after[0], after[0], after[1]]
+        sql += ' ORDER BY score, post_id'
+        if limit:
+            sql += ' LIMIT %s'
+            params.append(limit)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [tuple(row) for row in cursor.fetchall()]
+
+
+class InvertedIndex:
+    """Класс обратного индекса на таблице `SearchTerm`.
+
+    Ранг вычисляется по BM25 без нормализации по длине текста и
+    берется со знаком минус, чтобы сортировка совпадала с FTS5.
+    Пост находится, только если содержит все слова запроса.
+    """
+
+    def update(self, post):
+        SearchTerm.objects.filter(post_id=post.pk).delete()
+        SearchTerm.objects.bulk_create(
+            self._terms(post.pk, post.title, post.text)
+        )
+
+    def remove(self, post_pk):
+        self.remove_many([post_pk])
+
+    def remove_many(self, post_pks):
+        SearchTerm.objects.filter(post_id__in=list(post_pks)).delete()
+
+    def rebuild(self, batch_size=1000):
+        SearchTerm.objects.all().delete()
+        batch = []
+        for pk, title, text in Post.objects.order_by().values_list(
+            'pk', 'title', 'text'
+        ).iterator(chunk_size=batch_size):
+            batch.extend(self._terms(pk, title, text))
+            if len(batch) >= batch_size:
+                SearchTerm.objects.bulk_create(batch, batch_size=batch_size)
+                batch = []
+        SearchTerm.objects.bulk_create(batch, batch_size=batch_size)
+
+    def _terms(self, post_pk, title, text):
+        return [
+            SearchTerm(term=term, post_id=post_pk, weight=weight)
+            for term, weight in term_weights(title, text).items()
+        ]
+
+    def search(self, query, after=None, limit=None):
+        """Отдает пары (ранг, id поста) по возрастанию ранга после `after`.
+
+        Ранг считается и сортируется в базе, в Python попадают только
+        `limit` строк; число постов берется из периодического пересчета.
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        postings = SearchTerm.objects.filter(term__in=terms)
+        frequencies = dict(
+            postings.order_by().values_list('term').annotate(Count('pk'))
+        )
+        if len(frequencies) < len(terms):
+            return []
+        total = sampled_count(Post.objects.all(), 'search:documents')
+        idf = Case(
+            *(
+                When(term=term, then=Value(
+                    math.log(1 + (total - count + 0.5) / (count + 0.5))
+                ))
+                for term, count in frequencies.items()
+            ),
+            output_field=FloatField()
+        )
+        weight = Cast('weight', FloatField())
+        hits = postings.order_by().values('post_id').annotate(
+            matched=Count('term'),
+            rank=-Sum(idf * weight * (BM25_K1 + 1) / (weight + BM25_K1))
+        ).filter(matched=len(terms))
+        if after:
+            hits = hits.filter(
+                Q(rank__gt=after[0])
+                | Q(rank=after[0], post_id__gt=after[1])
+            )
+        hits = hits.order_by('rank', 'post_id').values_list(
+            'rank', 'post_id'
+        )
+        return list(hits[:limit] if limit else hits)
+
+
+@lru_cache(maxsize=None)
+def _fts5_available(alias, name):
+    # Псевдоним и имя базы — ключ кэша: тестовая база создается заново.
+    return (
+        connection.vendor == 'sqlite'
+        and FTS_TABLE in connection.introspection.table_names()
+    )
+
+
+def get_search_index():
+    """Отдает поисковый индекс согласно `BLOG_SEARCH_BACKEND`.
+
+    Значение 'auto' выбирает FTS5, если миграция смогла создать
+    виртуальную таблицу, и обратный индекс в остальных случаях.
+    """
+    backend = settings.BLOG_SEARCH_BACKEND
+    if backend == 'auto':
+        backend = 'fts5' if _fts5_available(
+            connection.alias, connection.settings_dict['NAME']
+        ) else 'python'
+    return Fts5Index() if backend == 'fts5' else InvertedIndex()
+
+
+class SearchPaginator:
+    """Класс курсорной пагинации результатов поиска.
+
+    Курсор хранит ранг и id последнего поста страницы. Совпадения
+    берутся из индекса порциями и фильтруются запросом `object_list`,
+    поэтому на выдачу действуют те же правила публикации, что и
+    на ленты.
+    """
+
+    def __init__(self, object_list, per_page, query, index=None):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.query = query
+        self.index = index or get_search_index()
+
+    def encode_cursor(self, post):
+        return encode_token([post.search_rank, post.pk])
+
+    def decode_cursor(self, token):
+        """Раскодирует токен или вызывает `InvalidPage`."""
+        return tuple(decode_token(token, [float, int]))
+
+    def page(self, after=None):
+        """Отдает страницу результатов после курсора `after`."""
+        cursor = self.decode_cursor(after) if after else None
+        # Часть совпадений может оказаться скрытой, поэтому порция
+        # берется с запасом.
+        batch_size = self.per_page * 2 + 1
+        found = []
+        while len(found) <= self.per_page:
+            hits = self.index.search(self.query, cursor, batch_size)
+            if not hits:
+                break
+            posts = self.object_list.in_bulk([pk for _, pk in hits])
+            for rank, pk in hits:
+                if pk in posts:
+                    posts[pk].search_rank = rank
+                    found.append(posts[pk])
+            if len(hits) < batch_size:
+                break
+            cursor = hits[-1]
+        return CursorPage(
+            found[:self.per_page], self,
+            has_next=len(found) > self.per_page,
+            has_previous=bool(after)
+        )
@@ -0,0 +1,275 @@
+"""Модуль с обработчиками сигналов моделей приложения blog."""
+
+import threading
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import (post_delete, post_init, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .caching import (CATALOG_GROUP, INDEX_GROUP, category_group,
+                      forget_next_publication, invalidate_groups,
+                      invalidate_posts, post_cache_groups, profile_group)
+from .jobs import enqueue
+from .models import Category, Comment, Location, Post, User
+from .search import get_search_index
+
+
+class _DeletionScope(threading.local):
+    """Класс ключей объектов, удаление которых идет в текущем потоке.
+
+    Ключ добавляется в pre_delete и убирается в post_delete объекта,
+    поэтому сигналы каскадно удаляемых зависимых объектов могут
+    пропустить работу, которую удаление делает целиком. Ключ
+    действует, пока не завершена транзакция удаления: если она
+    откатилась до post_delete, вместе с ней отбрасывается
+    и ее обработчик on_commit, и ключ больше не учитывается.
+    """
+
+    def __init__(self):
+        self.marks = {}
+
+    def add(self, pk, using):
+        def forget():
+            self.marks.pop(pk, None)
+
+        self.marks[pk] = (using, forget)
+        transaction.on_commit(forget, using)
+
+    def discard(self, pk):
+        self.marks.pop(pk, None)
+
+    def __contains__(self, pk):
+        mark = self.marks.get(pk)
+        if mark is None:
+            return False
+        using, forget = mark
+        pending = transaction.get_connection(using).run_on_commit
+        if any(entry[1] is forget for entry in pending):
+            return True
+        self.discard(pk)
+        return False
+
+
+_deleting_authors = _DeletionScope()
+_deleting_posts = _DeletionScope()
+
+
+@receiver(post_init, sender=Comment)
+def remember_comment_post(sender, instance, **kwargs):
+    """Запоминает пост, к которому комментарий относился при загрузке."""
+    instance._loaded_post_id = instance.__dict__.get('post_id')
+
+
+def _decrement_comment_count(post_id):
+    Post.objects.filter(pk=post_id, comment_count__gt=0).update(
+        comment_count=F('comment_count') - 1,
+        updated_at=timezone.now()
+    )
+
+
+@receiver(post_save, sender=Comment)
+def update_post_on_comment_save(sender, instance, created, **kwargs):
+    """Обновляет счетчик комментариев и время изменения поста.
+
+    Время изменения поста учитывает и правки его комментариев,
+    по нему вычисляется Last-Modified страницы поста. Комментарий,
+    перенесенный к другому посту, учитывается у обоих постов.
+    """
+    if kwargs.get('raw'):
+        return
+    old_post_id = getattr(instance, '_loaded_post_id', None)
+    moved = not created and old_post_id not in (None, instance.post_id)
+    changes = {'updated_at': timezone.now()}
+    if created or moved:
+        changes['comment_count'] = F('comment_count') + 1
+    Post.objects.filter(pk=instance.post_id).update(**changes)
+    if moved:
+        _decrement_comment_count(old_post_id)
+        invalidate_posts(Post.objects.filter(pk=old_post_id))
+    instance._loaded_post_id = instance.post_id
+
+
+@receiver(post_delete, sender=Comment)
+def update_post_on_comment_delete(sender, instance, **kwargs):
+    """Уменьшает счетчик комментариев поста при удалении комментария.
+
+    Срабатывает и при каскадном удалении комментариев пользователя.
+    Комментарии удаляемого поста пропускаются: пост удаляется
+    вместе со счетчиком и кэш его страниц сбрасывается один раз.
+    """
+    if instance.post_id not in _deleting_posts:
+        _decrement_comment_count(instance.post_id)
+
+
+@receiver(pre_save, sender=Post)
+def fill_loaded_updated_at(sender, instance, raw=False, **kwargs):
+    """Заполняет время изменения постов из фикстур без этого поля.
+
+    При загрузке фикстуры `auto_now` не срабатывает, а в старых
+    выгрузках (db.json) поля `updated_at` еще нет.
+    """
+    if raw and instance.updated_at is None:
+        instance.updated_at = instance.created_at
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=Category)
+@receiver(pre_save, sender=User)
+def remember_cache_groups(
+    sender, instance, raw=False, update_fields=None, **kwargs
+):
+    """Запоминает группы кэша, к которым объект относился до изменения."""
+    instance._old_cache_groups = set()
+    if raw or instance.pk is None:
+        return
+    if sender is User:
+        # Вход пользователя сохраняет только last_login.
+        if update_fields is not None and 'username' not in update_fields:
+            return
+        old_username = User.objects.filter(pk=instance.pk).values_list(
+            'username', flat=True
+        ).first()
+        if old_username and old_username != instance.username:
+            instance._old_cache_groups = {profile_group(old_username)}
+        return
+    if sender is Post:
+        old = Post.objects.filter(pk=instance.pk).values_list(
+            'author__username', 'category__slug', 'image'
+        ).first()
+        if old:
+            instance._old_cache_groups = post_cache_groups(
+                instance.pk, *old[:2]
+            )
+            instance._old_image = old[2]
+    else:
+        old_slug = Category.objects.filter(pk=instance.pk).values_list(
+            'slug', flat=True
+        ).first()
+        if old_slug:
+            instance._old_cache_groups = {category_group(old_slug)}
+
+
+@receiver(pre_delete, sender=User)
+def invalidate_deleted_author_pages(sender, instance, using, **kwargs):
+    """Сбрасывает кэш страниц постов удаляемого автора одним запросом.
+
+    Сигналы каскадно удаляемых постов автора после этого кэш
+    не сбрасывают и не читают автора и категорию каждого поста.
+    """
+    invalidate_posts(Post.objects.filter(author_id=instance.pk))
+    invalidate_groups({profile_group(instance.username)})
+    forget_next_publication()
+    _deleting_authors.add(instance.pk, using)
+
+
+@receiver(post_delete, sender=User)
+def forget_deleted_author(sender, instance, **kwargs):
+    _deleting_authors.discard(instance.pk)
+
+
+@receiver(pre_delete, sender=Post)
+def remember_deleted_post(sender, instance, using, **kwargs):
+    _deleting_posts.add(instance.pk, using)
+
+
+@receiver(post_delete, sender=Post)
+def forget_deleted_post(sender, instance, **kwargs):
+    _deleting_posts.discard(instance.pk)
+
+
+def _related_value(instance, field, model, attname):
+    """Отдает поле связанного объекта, не загружая объект целиком."""
+    descriptor = getattr(type(instance), field)
+    if descriptor.is_cached(instance):
+        related = getattr(instance, field)
+        return getattr(related, attname) if related else None
+    related_id = getattr(instance, f'{field}_id')
+    if related_id is None:
+        return None
+    return model.objects.filter(pk=related_id).values_list(
+        attname, flat=True
+    ).first()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, **kwargs):
+    """Сбрасывает кэш страниц, на которых отображается пост."""
+    if instance.author_id in _deleting_authors:
+        return
+    forget_next_publication()
+    invalidate_groups(
+        getattr(instance, '_old_cache_groups', set())
+        | post_cache_groups(
+            instance.pk,
+            _related_value(instance, 'author', User, 'username'),
+            _related_value(instance, 'category', Category, 'slug')
+        )
+    )
+
+
+@receiver(post_save, sender=Post)
+def update_image_variants(sender, instance, raw=False, **kwargs):
+    """Ставит в очередь пересоздание копий при замене изображения поста."""
+    if raw:
+        return
+    old_image = getattr(instance, '_old_image', '') or ''
+    if (instance.image.name or '') != old_image:
+        enqueue(
+            'post_image_variants',
+            key=f'post_image_variants:{instance.pk}',
+            post_pk=instance.pk
+        )
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(sender, instance, update_fields=None, **kwargs):
+    """Обновляет запись поста в поисковом индексе."""
+    if update_fields is not None and not {'title', 'text'} & set(
+        update_fields
+    ):
+        return
+    get_search_index().update(instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_search_index(sender, instance, **kwargs):
+    """Удаляет пост из поискового индекса."""
+    get_search_index().remove(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_pages(sender, instance, **kwargs):
+    """Сбрасывает кэш поста и лент, где выводится число комментариев."""
+    if instance.post_id not in _deleting_posts:
+        invalidate_posts(Post.objects.filter(pk=instance.post_id))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_pages(sender, instance, **kwargs):
+    """Сбрасывает кэш категории и страниц с постами."""
+    invalidate_groups(
+        getattr(instance, '_old_cache_groups', set())
+        | {INDEX_GROUP, CATALOG_GROUP, category_group(instance.slug)}
+    )
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_location_pages(sender, instance, **kwargs):
+    """Сбрасывает кэш страниц с постами."""
+    invalidate_groups({CATALOG_GROUP})
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_pages(sender, instance, created, **kwargs):
+    """Сбрасывает кэш страниц постов автора при смене имени пользователя."""
+    old_groups = getattr(instance, '_old_cache_groups', set())
+    if old_groups:
+        invalidate_groups(old_groups | {profile_group(instance.username)})
+        invalidate_posts(Post.objects.filter(author_id=instance.pk))
@@ -0,0 +1,220 @@
+"""Модуль потоковых карт сайта приложения blog.
+
+Карта разбита на части не более чем по `BLOG_SITEMAP_LIMIT` адресов:
+часть с номером `n` содержит объекты с ключами из полуинтервала
+(n * limit, (n + 1) * limit], поэтому ее выборка идет по индексу
+первичного ключа без OFFSET. Части перечислены в индексе карты
+`sitemap.xml`, а сами части выводятся потоком по мере чтения
+строк из базы через `iterator()`.
+"""
+
+from django.conf import settings
+from django.db.models import Count, Exists, F, IntegerField, Max, OuterRef
+from django.db.models.functions import Cast, Greatest
+from django.http import Http404, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.html import escape
+from django.utils.http import http_date
+from django.views.generic import View
+
+from .models import Category, Post, User
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+XMLNS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+class SitemapSection:
+    """Класс раздела карты сайта.
+
+    Объекты раздела — все объекты модели `model`, если
+    `get_queryset()` не переопределен. Адрес объекта строится
+    по маршруту `url_name` со значением поля `url_field`. `lastmod` —
+    имя поля или выражение с датой изменения адреса, если она известна.
+    """
+
+    model = None
+    url_name = None
+    url_field = 'pk'
+    lastmod = None
+
+    def get_queryset(self):
+        return self.model._default_manager.all()
+
+    def shard(self, number):
+        """Отдает объекты части карты с номером `number`."""
+        limit = settings.BLOG_SITEMAP_LIMIT
+        return self.get_queryset().filter(
+            pk__gt=number * limit, pk__lte=(number + 1) * limit
+        ).order_by('pk')
+
+    def shards(self):
+        """Отдает номера непустых частей и время их изменения.
+
+        Все части вычисляются одним запросом с группировкой
+        по номеру части.
+        """
+        number = Cast(
+            (F('pk') - 1) / settings.BLOG_SITEMAP_LIMIT, IntegerField()
+        )
+        rows = self.get_queryset().order_by().annotate(
+            shard=number
+        ).values('shard').annotate(
+            lastmod=Max(self.lastmod) if self.lastmod
+            else Count('pk')
+        ).order_by('shard')
+        return [
+            (row['shard'], row['lastmod'] if self.lastmod else None)
+            for row in rows
+        ]
+
+    def modification_state(self, number):
+        """Отдает время изменения и число адресов части карты.
+
+        Число адресов считается в пределах одной части, поэтому
+        запрос ограничен `BLOG_SITEMAP_LIMIT` строками индекса.
+        """
+        aggregates = {'total': Count('pk')}
+        if self.lastmod:
+            aggregates['lastmod'] = Max(self.lastmod)
+        state = self.shard(number).order_by().aggregate(**aggregates)
+        return state.get('lastmod'), state['total']
+
+    def rows(self, number):
+        """Отдает значения для адресов части карты, читая базу порциями."""
+        fields = [self.url_field]
+        if self.lastmod:
+            fields.append(self.lastmod)
+        return self.shard(number).values_list(*fields).iterator(
+            chunk_size=settings.BLOG_SITEMAP_CHUNK_SIZE
+        )
+
+
+class PostSitemap(SitemapSection):
+    model = Post
+    url_name = 'blog:post_detail'
+    # Отложенный пост меняет карту в момент публикации.
+    lastmod = Greatest('updated_at', 'pub_date')
+
+    def get_queryset(self):
+        return Post.objects.published()
+
+
+class CategorySitemap(SitemapSection):
+    model = Category
+    url_name = 'blog:category_posts'
+    url_field = 'slug'
+
+    def get_queryset(self):
+        return Category.objects.filter(is_published=True)
+
+
+class ProfileSitemap(SitemapSection):
+    model = User
+    url_name = 'blog:profile'
+    url_field = 'username'
+
+    def get_queryset(self):
+        # В карту попадают только авторы опубликованных постов.
+        return User.objects.filter(
+            Exists(Post.objects.published().filter(author=OuterRef('pk')))
+        )
+
+
+SECTIONS = {
+    'posts': PostSitemap(),
+    'categories': CategorySitemap(),
+    'profiles': ProfileSitemap(),
+}
+
+
+def _lastmod(value):
+    return f'<lastmod>{value.date().isoformat()}</lastmod>' if value else ''
+
+
+class SitemapMixin:
+    """Класс с общими атрибутами для индекса и частей карты сайта."""
+
+    def get_base_url(self):
+        return self.request.build_absolute_uri('/')[:-1]
+
+    def make_response(self, content):
+        response = StreamingHttpResponse(
+            content, content_type='application/xml; charset=utf-8'
+        )
+        patch_cache_control(
+            response, public=True, max_age=settings.BLOG_SITEMAP_MAX_AGE
+        )
+        return response
+
+
+class SitemapIndexView(SitemapMixin, View):
+    """Класс с выдачей индекса карты сайта."""
+
+    def get(self, request):
+        base = self.get_base_url()
+        entries = []
+        for name, section in SECTIONS.items():
+            for number, lastmod in section.shards():
+                location = base + reverse(
+                    'blog:sitemap_section', args=[name, number]
+                )
+                entries.append(
+                    f'<sitemap><loc>{escape(location)}</loc>'
+                    f'{_lastmod(lastmod)}</sitemap>\n'
+                )
+        return self.make_response([
+            XML_HEADER,
+            f'<sitemapindex xmlns="{XMLNS}">\n',
+            *entries,
+            '</sitemapindex>\n',
+        ])
+
+
+class SitemapSectionView(SitemapMixin, View):
+    """Класс с потоковой выдачей части карты сайта.
+
+    Для разделов с датой изменения отдает ETag и Last-Modified
+    и отвечает 304, не читая адреса из базы. Пустая часть — 404.
+    """
+
+    def get(self, request, section, number):
+        if section not in SECTIONS:
+            raise Http404('Раздел карты сайта не найден.')
+        section = SECTIONS[section]
+        lastmod, total = section.modification_state(number)
+        # Пустые части, в том числе за последним диапазоном ключей,
+        # не перечислены в индексе карты.
+        if not total:
+            raise Http404('Часть карты сайта не найдена.')
+        etag = None
+        timestamp = int(lastmod.timestamp()) if lastmod else None
+        if lastmod:
+            etag = f'"{timestamp}-{total}"'
+            response = get_conditional_response(
+                request, etag=etag, last_modified=timestamp
+            )
+            if response is not None:
+                return response
+        response = self.make_response(
+            self.stream(section, number, self.get_base_url())
+        )
+        if lastmod:
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(timestamp)
+        return response
+
+    def stream(self, section, number, base):
+        """Выводит адреса части карты порциями по мере чтения из базы."""
+        yield XML_HEADER + f'<urlset xmlns="{XMLNS}">\n'
+        lines = []
+        for row in section.rows(number):
+            location = escape(base + reverse(section.url_name, args=[row[0]]))
+            lines.append(
+                f'<url><loc>{location}</loc>'
+                f'{_lastmod(row[1] if len(row) > 1 else None)}</url>\n'
+            )
+            if len(lines) >= settings.BLOG_SITEMAP_CHUNK_SIZE:
+                yield ''.join(lines)
+                lines = []
+        yield ''.join(lines) + '</urlset>\n'
@@ -0,0 +1,88 @@
+"""Модуль хранилища изображений постов с дедупликацией по содержимому."""
+
+import hashlib
+import os
+import posixpath
+from uuid import uuid4
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Класс хранилища, сохраняющего файл под SHA-256 его содержимого.
+
+    Файл с одинаковым содержимым хранится один раз: повторная загрузка
+    отдает имя уже сохраненного файла и обновляет время его изменения.
+    Файлы без ссылок удаляет периодическая сборка
+    (см. `images.collect_images`), и только давно не менявшиеся.
+    """
+
+    chunk_size = 64 * 1024
+
+    def digest(self, content):
+        """Отдает SHA-256 содержимого, читая файл частями."""
+        sha256 = hashlib.sha256()
+        for chunk in content.chunks(self.chunk_size):
+            sha256.update(chunk)
+        return sha256.hexdigest()
+
+    def get_available_name(self, name, max_length=None):
+        # Имя определяется содержимым в _save, суффиксы не нужны.
+        return name
+
+    def _save(self, name, content):
+        digest = self.digest(content)
+        directory, filename = posixpath.split(name)
+        name = posixpath.join(
+            directory,
+            digest[:2],
+            digest + posixpath.splitext(filename)[1].lower()
+        )
+        try:
+            # Сборка мусора не удалит файл, загруженный заново.
+            os.utime(self.path(name))
+            return name
+        except FileNotFoundError:
+            pass
+        # Файл пишется под временным именем и затем атомарно
+        # переименовывается: параллельная загрузка того же содержимого
+        # не увидит недописанный файл.
+        temporary = super()._save(f'{name}.{uuid4().hex}.part', content)
+        os.replace(self.path(temporary), self.path(name))
+        return name
+
+    def modified_before(self, name, cutoff):
+        """Отдает True, если файл не менялся с `cutoff` (время Unix)."""
+        try:
+            return os.stat(self.path(name)).st_mtime < cutoff
+        except FileNotFoundError:
+            return False
+
+    def delete_unmodified(self, name, cutoff):
+        """Удаляет файл, если он не менялся с `cutoff`, и отдает успех.
+
+        Файл сначала переименовывается: загрузка того же содержимого
+        после этого запишет новый файл, а загрузка, успевшая обновить
+        время изменения раньше, вернет файл на прежнее место.
+        """
+        path = self.path(name)
+        trash = f'{path}.{uuid4().hex}.trash'
+        try:
+            os.rename(path, trash)
+        except FileNotFoundError:
+            return False
+        if os.stat(trash).st_mtime >= cutoff:
+            try:
+                os.link(trash, path)
+            except FileExistsError:
+                # Тем временем записан новый файл с тем же содержимым.
+                pass
+            os.remove(trash)
+            return False
+        os.remove(trash)
+        return True
+
+
+post_image_storage = ContentAddressedStorage()
@@ -0,0 +1,26 @@
+"""Модуль с тегами шаблонов приложения blog."""
+
+from django import template
+from django.utils.safestring import mark_safe
+
+from blog.caching import render_post_cards
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_cards(posts):
+    """Отдает карточки постов страницы, читая кэш фрагментов разом."""
+    return [mark_safe(card) for card in render_post_cards(posts)]
+
+
+@register.simple_tag
+def page_window(page, on_each_side=2, on_ends=1):
+    """Отдает номера страниц вокруг текущей и по краям с пропусками.
+
+    Число ссылок не зависит от числа страниц; пропуск обозначается
+    значением `paginator.ELLIPSIS`.
+    """
+    return list(page.paginator.get_elided_page_range(
+        page.number, on_each_side=on_each_side, on_ends=on_ends
+    ))
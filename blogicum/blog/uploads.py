@@ -0,0 +1,131 @@
+"""Модуль потоковой обработки загружаемых изображений."""
+
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import RequestDataTooBig
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
+
+IMAGE_FORMATS = ('JPEG', 'PNG', 'GIF', 'WEBP')
+# Сколько байт начала файла держать в памяти в поисках заголовка.
+# Заголовок, не найденный в этих пределах, проверяется по всему файлу.
+HEADER_MAX_SIZE = 256 * 2 ** 10
+NOT_AN_IMAGE = (
+    'Загрузите правильное изображение. Файл, который вы загрузили, '
+    'поврежден или не является изображением.'
+)
+
+
+class RejectedUpload(SimpleUploadedFile):
+    """Класс отклоненного при загрузке файла.
+
+    Содержимое файла не сохраняется, хранится только причина отказа,
+    которую форма выводит как ошибку поля.
+    """
+
+    def __init__(self, name, error):
+        super().__init__(name, b'')
+        self.upload_error = error
+
+
+class LimitedImageUploadHandler(TemporaryFileUploadHandler):
+    """Класс обработчика загрузок с ранней проверкой изображений.
+
+    Файл пишется во временный файл частями по `chunk_size` байт,
+    поэтому память процесса не зависит от размера загрузки.
+    Формат и размеры изображения проверяются по заголовку из первых
+    частей файла без декодирования пикселей. Файл больше
+    `POST_IMAGE_MAX_UPLOAD_SIZE` или с размерами больше
+    `POST_IMAGE_MAX_DIMENSIONS` дальше не записывается и передается
+    форме как `RejectedUpload`. Запрос, объявленный размер которого
+    заведомо больше допустимого, отклоняется до чтения тела.
+    """
+
+    chunk_size = 64 * 2 ** 10
+
+    def handle_raw_input(
+        self, input_data, META, content_length, boundary, encoding=None
+    ):
+        # Кроме файла тело запроса содержит только поля формы,
+        # объем которых ограничен DATA_UPLOAD_MAX_MEMORY_SIZE.
+        limit = settings.POST_IMAGE_MAX_UPLOAD_SIZE + (
+            settings.DATA_UPLOAD_MAX_MEMORY_SIZE or 0
+        )
+        if content_length > limit:
+            raise RequestDataTooBig(
+                'Request body exceeded settings.POST_IMAGE_MAX_UPLOAD_SIZE.'
+            )
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.header = b''
+        self.image_format = None
+        self.error = None
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.error:
+            return None
+        if start + len(raw_data) > settings.POST_IMAGE_MAX_UPLOAD_SIZE:
+            return self.reject(
+                'Размер файла не должен превышать '
+                f'{filesizeformat(settings.POST_IMAGE_MAX_UPLOAD_SIZE)}.'
+            )
+        if self.header is not None:
+            self.header += raw_data
+            self.check_header(BytesIO(self.header))
+            if self.image_format is None and (
+                len(self.header) >= HEADER_MAX_SIZE
+            ):
+                self.header = None
+            if self.error:
+                return None
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        if not self.error and self.image_format is None:
+            self.file.flush()
+            self.file.seek(0)
+            self.check_header(self.file)
+            if self.image_format is None and not self.error:
+                self.reject(NOT_AN_IMAGE)
+        if self.error:
+            return RejectedUpload(self.file_name, self.error)
+        uploaded = super().file_complete(file_size)
+        uploaded.image_format = self.image_format
+        return uploaded
+
+    def check_header(self, file):
+        """Проверяет формат и размеры изображения по его заголовку.
+
+        Pillow читает только заголовок, пиксели не декодируются.
+        Если данных для заголовка пока недостаточно, ничего не делает.
+        """
+        max_width, max_height = settings.POST_IMAGE_MAX_DIMENSIONS
+        too_large = (
+            'Размеры изображения не должны превышать '
+            f'{max_width}×{max_height} пикселей.'
+        )
+        try:
+            with Image.open(file) as image:
+                image_format, (width, height) = image.format, image.size
+        except Image.DecompressionBombError:
+            self.reject(too_large)
+            return
+        except (OSError, SyntaxError, ValueError, EOFError):
+            return
+        self.image_format = image_format
+        self.header = None
+        if image_format not in IMAGE_FORMATS:
+            self.reject(NOT_AN_IMAGE)
+        elif width > max_width or height > max_height:
+            self.reject(too_large)
+
+    def reject(self, error):
+        """Прекращает запись файла и запоминает причину отказа."""
+        self.error = error
+        self.header = None
+        # Временный файл удаляется при закрытии.
+        self.file.close()
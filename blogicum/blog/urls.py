@@ -2,7 +2,7 @@
 
 from django.urls import path
 
-from . import views
+from . import feeds, sitemaps, views
 
 app_name = 'blog'
 
@@ -12,6 +12,31 @@ urlpatterns = [
         views.Index.as_view(),
         name='index'
     ),
+    path(
+        'rss/',
+        feeds.LatestPostsFeed(),
+        name='rss_feed'
+    ),
+    path(
+        'atom/',
+        feeds.LatestPostsAtomFeed(),
+        name='atom_feed'
+    ),
+    path(
+        'sitemap.xml',
+        sitemaps.SitemapIndexView.as_view(),
+        name='sitemap'
+    ),
+    path(
+        'sitemap-<str:section>-<int:number>.xml',
+        sitemaps.SitemapSectionView.as_view(),
+        name='sitemap_section'
+    ),
+    path(
+        'search/',
+        views.PostSearchView.as_view(),
+        name='search'
+    ),
     path(
         'posts/create/',
         views.PostCreateView.as_view(),
@@ -37,11 +62,31 @@ urlpatterns = [
         views.CategoryPosts.as_view(),
         name='category_posts'
     ),
+    path(
+        'category/<slug:category_slug>/rss/',
+        feeds.CategoryPostsFeed(),
+        name='category_rss_feed'
+    ),
+    path(
+        'category/<slug:category_slug>/atom/',
+        feeds.CategoryPostsAtomFeed(),
+        name='category_atom_feed'
+    ),
     path(
         'profile/<str:username>/',
         views.UserProfile.as_view(),
         name='profile'
     ),
+    path(
+        'profile/<str:username>/rss/',
+        feeds.UserPostsFeed(),
+        name='profile_rss_feed'
+    ),
+    path(
+        'profile/<str:username>/atom/',
+        feeds.UserPostsAtomFeed(),
+        name='profile_atom_feed'
+    ),
     path(
         'edit-profile/',
         views.ProfileUpdateView.as_view(),
@@ -52,6 +97,11 @@ urlpatterns = [
         views.CommentCreateView.as_view(),
         name='add_comment'
     ),
+    path(
+        'posts/<int:post_pk>/comments/',
+        views.CommentListView.as_view(),
+        name='comments'
+    ),
     path(
         'posts/<int:post_pk>/edit_comment/<int:comment_id>/',
         views.EditCommentView.as_view(),
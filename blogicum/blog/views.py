@@ -1,23 +1,41 @@
 """Модуль, с определением функций-обработчиков приложения blog."""
 
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.db.models import Count
-from django.shortcuts import get_object_or_404, redirect
+from django.core.paginator import InvalidPage
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse, reverse_lazy
-from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.utils.functional import cached_property
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 from django.views.generic import (CreateView, DeleteView, DetailView, ListView,
-                                  UpdateView)
+                                  UpdateView, View)
 
+from .caching import (CATALOG_GROUP, INDEX_GROUP, AnonymousPageCacheMixin,
+                      ConditionalGetMixin, category_group,
+                      get_group_versions, post_group, profile_group)
 from .forms import CommentForm, PostForm, ProfileChangeForm
-from .models import Category, Comment, Post, User
+from .models import Category, Comment, Post, User, publication_boundary
+from .paginators import CachedCountPaginator, CursorPaginator
+from .search import SearchPaginator
+from .uploads import LimitedImageUploadHandler
 
 
 class OnlyAuthorMixin(UserPassesTestMixin):
     """Класс проверки авторства пользователя."""
 
+    def get_object(self, queryset=None):
+        """Отдает объект, запрашивая его из базы один раз за запрос."""
+        if queryset is not None:
+            return super().get_object(queryset)
+        if '_object' not in self.__dict__:
+            self._object = super().get_object()
+        return self._object
+
     def test_func(self):
         """Проверяет авторство текущего пользователя."""
-        return self.get_object().author == self.request.user
+        return self.get_object().author_id == self.request.user.pk
 
 
 class PostsListMixin:
@@ -25,6 +43,74 @@ class PostsListMixin:
 
     model = Post
     paginate_by = 10
+    paginator_class = CachedCountPaginator
+
+    def get_count_key(self):
+        """Отдает ключ, общий для всех страниц одной ленты."""
+        return self.request.path
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        """Отдает пагинатор, кэширующий число постов выборки."""
+        count_version = '|'.join([
+            publication_boundary().isoformat(),
+            *get_group_versions(self.get_cache_groups()),
+        ])
+        return super().get_paginator(
+            queryset,
+            per_page,
+            count_key=self.get_count_key(),
+            count_version=count_version,
+            **kwargs
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        """Разбивает посты на страницы по номеру или по курсору."""
+        if not settings.POSTS_CURSOR_PAGINATION:
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(queryset, page_size)
+        try:
+            page = paginator.page(
+                after=self.request.GET.get('after'),
+                before=self.request.GET.get('before')
+            )
+        except InvalidPage as error:
+            raise Http404(str(error))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_modification_state(self):
+        """Отдает время изменения и отпечаток постов текущей страницы.
+
+        Читаются только строки страницы и дата самого нового поста
+        ленты: отложенный пост, дождавшийся публикации, сдвигает все
+        страницы, не меняя версий групп.
+        """
+        # Ключи связей нужны менеджерам связанных объектов.
+        queryset = self.get_queryset().select_related(None).only(
+            'pk', 'pub_date', 'updated_at', 'author_id', 'category_id'
+        )
+        _, page, rows, _ = self.paginate_queryset(queryset, self.paginate_by)
+        rows = list(rows)
+        if rows and not page.has_previous():
+            newest = rows[0].pub_date
+        else:
+            newest = queryset.values_list('pub_date', flat=True).first()
+        dates = [post.updated_at for post in rows]
+        if newest:
+            dates.append(newest)
+        return max(dates, default=None), [newest, *(
+            f'{post.pk}:{post.updated_at.timestamp()}' for post in rows
+        )]
+
+    def get_context_data(self, **kwargs):
+        """Добавляет в контекст шаблон пагинатора."""
+        return super().get_context_data(
+            paginator_template=(
+                'includes/cursor_paginator.html'
+                if settings.POSTS_CURSOR_PAGINATION
+                else 'includes/paginator.html'
+            ),
+            **kwargs
+        )
 
 
 class CommentMixin:
@@ -57,6 +143,20 @@ class PostCreateMutateMixin:
         )
 
 
+@method_decorator(csrf_exempt, name='dispatch')
+class ImageUploadMixin:
+    """Класс подключения обработчика загрузки изображений поста.
+
+    Обработчики загрузки можно заменить только до чтения тела
+    запроса, а CsrfViewMiddleware читает его раньше представления.
+    Поэтому проверка CSRF переносится внутрь `dispatch`.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        request.upload_handlers = [LimitedImageUploadHandler(request)]
+        return csrf_protect(super().dispatch)(request, *args, **kwargs)
+
+
 class CommentDelEditMixin:
     """Класс с общими атрибутами для удаления и изменения комментария."""
 
@@ -64,63 +164,177 @@ class CommentDelEditMixin:
     pk_url_kwarg = 'comment_id'
 
 
+class VisiblePostMixin:
+    """Класс с общими атрибутами для страниц поста и его комментариев."""
+
+    def get_post(self):
+        """Отдает пост одним запросом со связанными объектами.
+
+        Автор видит свой пост всегда, остальные — только опубликованный.
+        """
+        post = get_object_or_404(
+            posts_filtering_ordering(posts_filtered=False),
+            pk=self.kwargs['post_pk']
+        )
+        if (
+            post.author_id != self.request.user.pk
+            and not post.is_visible()
+        ):
+            raise Http404('Пост не опубликован.')
+        return post
+
+    def get_comments_page(self, post):
+        """Отдает страницу комментариев после курсора `?after=`."""
+        paginator = CursorPaginator(
+            post.comments.select_related('author'),
+            settings.COMMENTS_PER_PAGE,
+            ordering=('created_at', 'id')
+        )
+        try:
+            return paginator.page(after=self.request.GET.get('after'))
+        except InvalidPage as error:
+            raise Http404(str(error))
+
+
 def posts_filtering_ordering(posts=Post.objects, posts_filtered=True):
-    """Содержит стандартные сортировку, фильтры и подсчет для постов."""
+    """Содержит стандартные сортировку и фильтры для постов."""
     if posts_filtered:
-        posts = posts.filter(
-            pub_date__date__lte=timezone.now(),
-            is_published=True,
-            category__is_published=True
-        )
+        posts = posts.published()
     return posts.select_related(
         'author', 'location', 'category'
-    ).annotate(
-        comment_count=Count('comments')
     ).order_by(
         *Post._meta.ordering
     )
 
 
-class Index(PostsListMixin, ListView):
+class Index(AnonymousPageCacheMixin, PostsListMixin, ListView):
     """Класс с обработкой главной страницы."""
 
     template_name = 'blog/index.html'
-    queryset = posts_filtering_ordering()
 
+    def get_cache_groups(self):
+        return [INDEX_GROUP, CATALOG_GROUP]
+
+    def get_queryset(self):
+        """Отдает ленту, отфильтрованную на момент запроса."""
+        return posts_filtering_ordering()
+
+
+class PostSearchView(ListView):
+    """Класс со страницей поиска по постам.
+
+    Результаты упорядочены по релевантности и разбиты на страницы
+    по курсору `?after=`.
+    """
+
+    model = Post
+    template_name = 'blog/search.html'
+    paginate_by = 10
+
+    @cached_property
+    def query(self):
+        return self.request.GET.get('q', '').strip()
 
-class PostDetailView(DetailView):
+    def get_queryset(self):
+        return posts_filtering_ordering()
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = SearchPaginator(queryset, page_size, self.query)
+        try:
+            page = paginator.page(after=self.request.GET.get('after'))
+        except InvalidPage as error:
+            raise Http404(str(error))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        return super().get_context_data(query=self.query, **kwargs)
+
+
+class PostDetailView(
+    ConditionalGetMixin, AnonymousPageCacheMixin, VisiblePostMixin, DetailView
+):
     """Класс с обработкой страницы определенного поста."""
 
     model = Post
     template_name = 'blog/detail.html'
 
+    def get_cache_groups(self):
+        return [post_group(self.kwargs['post_pk']), CATALOG_GROUP]
+
+    def get_modification_state(self):
+        """Отдает время последнего изменения поста и его комментариев.
+
+        Пост отбирается по тем же правилам видимости, что и в
+        `get_post()`, поэтому на скрытый пост ответа 304 не бывает.
+        """
+        posts = Post.objects.filter(pk=self.kwargs['post_pk'])
+        visible = posts.published()
+        if self.request.user.is_authenticated:
+            visible |= posts.filter(author_id=self.request.user.pk)
+        updated = visible.values_list('updated_at', flat=True).first()
+        if updated is None:
+            raise Http404('Пост не найден.')
+        return updated, (updated,)
+
     def get_object(self):
-        post = get_object_or_404(
-            Post,
-            pk=self.kwargs['post_pk']
-        )
-        if post.author == self.request.user:
-            return post
-        return get_object_or_404(
-            posts_filtering_ordering(),
-            pk=self.kwargs['post_pk']
-        )
+        return self.get_post()
 
     def get_context_data(self, **kwargs):
         return super().get_context_data(
             form=CommentForm(),
-            comments=self.object.comments.select_related('author'),
+            comments=self.get_comments_page(self.object),
             **kwargs,
         )
 
 
-class CategoryPosts(PostsListMixin, ListView):
+class CommentListView(VisiblePostMixin, View):
+    """Класс с выдачей следующих страниц комментариев поста.
+
+    Отдает HTML-фрагмент для вставки в страницу поста
+    или JSON при параметре `?format=json`.
+    """
+
+    def get(self, request, *args, **kwargs):
+        post = self.get_post()
+        comments = self.get_comments_page(post)
+        if request.GET.get('format') != 'json':
+            return render(
+                request,
+                'includes/comment_list.html',
+                {'post': post, 'comments': comments}
+            )
+        next_url = None
+        if comments.has_next():
+            next_url = (
+                f'{request.path}?format=json&after={comments.next_cursor}'
+            )
+        return JsonResponse({
+            'comments': [
+                {
+                    'id': comment.pk,
+                    'author': comment.author.username,
+                    'text': comment.text,
+                    'created_at': comment.created_at.isoformat(),
+                }
+                for comment in comments
+            ],
+            'next': next_url,
+        })
+
+
+class CategoryPosts(
+    ConditionalGetMixin, AnonymousPageCacheMixin, PostsListMixin, ListView
+):
     """Класс с обработкой страницы категории."""
 
     template_name = 'blog/category.html'
 
-    def get_category(self):
-        """Отдает опубликованную категорию или ошибку '404'."""
+    def get_cache_groups(self):
+        return [category_group(self.kwargs['category_slug']), CATALOG_GROUP]
+
+    @cached_property
+    def category(self):
+        """Опубликованная категория или ошибка '404'."""
         return get_object_or_404(
             Category.objects.filter(is_published=True),
             slug=self.kwargs['category_slug']
@@ -128,36 +342,48 @@ class CategoryPosts(PostsListMixin, ListView):
 
     def get_queryset(self):
         """Отдает отфильтрованный список постов опр. категории."""
-        return posts_filtering_ordering(self.get_category().posts)
+        return posts_filtering_ordering(self.category.posts)
 
     def get_context_data(self, **kwargs):
         """Описание словаря контекста категории."""
-        return super().get_context_data(**kwargs, category=self.get_category())
+        return super().get_context_data(**kwargs, category=self.category)
 
 
-class UserProfile(PostsListMixin, ListView):
+class UserProfile(
+    ConditionalGetMixin, AnonymousPageCacheMixin, PostsListMixin, ListView
+):
     """Класс с обработкой страницы профиля."""
 
     template_name = 'blog/profile.html'
 
-    def get_author(self):
-        """Отдает автора или ошибку "404"."""
+    def get_cache_groups(self):
+        return [profile_group(self.kwargs['username']), CATALOG_GROUP]
+
+    @cached_property
+    def author(self):
+        """Автор или ошибка "404"."""
         return get_object_or_404(
             User.objects, username=self.kwargs['username']
         )
 
+    @cached_property
+    def posts_filtered(self):
+        """Скрывать ли неопубликованные посты: автор видит все свои."""
+        return self.author.pk != self.request.user.pk
+
+    def get_count_key(self):
+        return f'{super().get_count_key()}|{self.posts_filtered}'
+
     def get_queryset(self):
         """Отдает отфильтрованный список постов опр. пользователя."""
-        author = self.get_author()
-        posts_filtered = (author != self.request.user)
         return posts_filtering_ordering(
-            author.posts,
-            posts_filtered
+            self.author.posts,
+            self.posts_filtered
         )
 
     def get_context_data(self, **kwargs):
         """Описание словаря контекста профиля."""
-        return super().get_context_data(**kwargs, profile=self.get_author())
+        return super().get_context_data(**kwargs, profile=self.author)
 
 
 class ProfileUpdateView(LoginRequiredMixin, UpdateView):
@@ -173,7 +399,9 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
         return self.request.user
 
 
-class PostCreateView(LoginRequiredMixin, PostCreateMutateMixin, CreateView):
+class PostCreateView(
+    ImageUploadMixin, LoginRequiredMixin, PostCreateMutateMixin, CreateView
+):
     """Класс с обработкой создания поста."""
 
     def form_valid(self, form):
@@ -182,13 +410,22 @@ class PostCreateView(LoginRequiredMixin, PostCreateMutateMixin, CreateView):
         return super().form_valid(form)
 
 
-class PostUpdateView(OnlyAuthorMixin, PostCreateMutateMixin, UpdateView):
+class PostUpdateView(
+    ImageUploadMixin, OnlyAuthorMixin, PostCreateMutateMixin, UpdateView
+):
     """Класс с обработкой редактирования поста."""
 
     def handle_no_permission(self):
         """Перенаправляет пользователя без доступа к редактированию поста."""
         return redirect('blog:post_detail', self.get_object().pk)
 
+    def form_valid(self, form):
+        """Валидация формы."""
+        # Автор поста — текущий пользователь (см. test_func):
+        # сигналы сброса кэша не перечитывают его имя из базы.
+        form.instance.author = self.request.user
+        return super().form_valid(form)
+
 
 class PostDeleteView(OnlyAuthorMixin, PostCreateMutateMixin, DeleteView):
     """Класс с обработкой удаления поста."""
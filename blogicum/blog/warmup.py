@@ -0,0 +1,79 @@
+"""Модуль прогрева шаблонов и маршрутов при запуске процесса.
+
+Первый запрос к процессу иначе платит за разбор шаблонов, импорт
+библиотек тегов и построение таблиц маршрутов. С кешированным
+загрузчиком шаблонов (см. `blogicum.settings_production`)
+скомпилированные шаблоны остаются в памяти процесса.
+"""
+
+import logging
+import os
+import time
+
+from django.template import engines
+from django.urls import get_resolver, resolve, reverse
+from django.urls.converters import IntConverter
+from django.urls.resolvers import URLPattern
+
+logger = logging.getLogger('blog.warmup')
+
+URL_NAMESPACES = ('blog', 'pages')
+
+
+def template_names(directory):
+    """Отдает имена всех шаблонов каталога относительно него."""
+    for root, _, files in os.walk(directory):
+        for file in files:
+            if file.endswith('.html'):
+                yield os.path.relpath(
+                    os.path.join(root, file), directory
+                ).replace(os.sep, '/')
+
+
+def warm_templates():
+    """Компилирует шаблоны из каталогов DIRS и отдает их имена."""
+    names = []
+    for engine in engines.all():
+        for directory in getattr(engine, 'dirs', ()):
+            for name in sorted(template_names(directory)):
+                engine.get_template(name)
+                names.append(name)
+    return names
+
+
+def sample_kwargs(pattern):
+    """Отдает значения параметров маршрута для его обращения."""
+    return {
+        name: 1 if isinstance(converter, IntConverter) else 'warmup'
+        for name, converter in getattr(
+            pattern.pattern, 'converters', {}
+        ).items()
+    }
+
+
+def warm_urls(namespaces=URL_NAMESPACES):
+    """Обращает и разрешает именованные маршруты пространств имен."""
+    resolver = get_resolver()
+    names = []
+    for namespace in namespaces:
+        _, namespace_resolver = resolver.namespace_dict[namespace]
+        for pattern in namespace_resolver.url_patterns:
+            if not isinstance(pattern, URLPattern) or not pattern.name:
+                continue
+            name = f'{namespace}:{pattern.name}'
+            resolve(reverse(name, kwargs=sample_kwargs(pattern)))
+            names.append(name)
+    return names
+
+
+def warm_up():
+    """Прогревает шаблоны и маршруты, отдает их число и время."""
+    start = time.perf_counter()
+    templates = warm_templates()
+    urls = warm_urls()
+    duration = time.perf_counter() - start
+    logger.info(
+        'Прогрев: шаблонов %d, маршрутов %d за %.0f мс.',
+        len(templates), len(urls), duration * 1000
+    )
+    return templates, urls, duration
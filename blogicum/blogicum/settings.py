@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -53,6 +54,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'blog.middleware.QueryBudgetMiddleware',
+    'blog.middleware.PrimaryPinMiddleware',
 ]
 
 ROOT_URLCONF = 'blogicum.urls'
@@ -88,6 +91,86 @@ DATABASES = {
     }
 }
 
+# Реплики для чтения моделей blog (blog.routers). Для проверки на двух
+# файлах SQLite укажите BLOGICUM_SQLITE_REPLICAS=db.replica.sqlite3
+# и копируйте основную базу командой manage.py sync_replicas.
+for number, name in enumerate(
+    filter(None, os.getenv('BLOGICUM_SQLITE_REPLICAS', '').split(','))
+):
+    DATABASES[f'replica_{number}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / name.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+
+DATABASE_ROUTERS = ['blog.routers.ReplicaRouter']
+
+# Сколько секунд клиент читает из основной базы после своей записи.
+REPLICA_PIN_SECONDS = 10
+
+REPLICA_HEALTH_CHECK_INTERVAL = 30
+
+# PRAGMA, выполняемые при открытии каждого соединения SQLite (blog.db).
+# WAL разрешает чтение во время записи; при synchronous=NORMAL в режиме
+# WAL сбой питания может откатить последние транзакции, но не портит
+# базу. cache_size с минусом задается в КиБ.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    'mmap_size': 128 * 2 ** 20,
+    'cache_size': -32 * 2 ** 10,
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+# В продакшене укажите общий для воркеров бэкенд (FileBasedCache,
+# memcached), чтобы сброс кэша по сигналам действовал во всех процессах.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Количество комментариев на одной странице поста.
+COMMENTS_PER_PAGE = 50
+
+# Время жизни кэша страниц для анонимных пользователей (0 — отключен).
+BLOG_PAGE_CACHE_TIMEOUT = 60 * 15
+
+# Время жизни кэша карточек постов в лентах (0 — отключен).
+BLOG_POST_CARD_CACHE_TIMEOUT = 60 * 60
+
+# Время хранения числа постов ленты для пагинатора (0 — не хранить).
+BLOG_PAGINATOR_COUNT_TIMEOUT = 60 * 15
+
+# Приближенный подсчет (blog.counting): до порога число строк считается
+# точно, выше — оценкой планировщика или пересчетом раз в интервал.
+BLOG_EXACT_COUNT_THRESHOLD = 10000
+BLOG_COUNT_SAMPLE_INTERVAL = 60 * 10
+
+# Объектов в одном пакете массовых действий модерации (blog.moderation).
+BLOG_MODERATION_BATCH_SIZE = 1000
+
+# RSS- и Atom-ленты (blog.feeds): время жизни в кэше и число записей.
+BLOG_FEED_CACHE_TIMEOUT = 60 * 15
+BLOG_FEED_ITEMS = 20
+
+# Карта сайта (blog.sitemaps): адресов в одной части (предел протокола
+# sitemaps — 50 000), строк в порции чтения из базы и время жизни
+# в кэше браузеров и прокси.
+BLOG_SITEMAP_LIMIT = 50000
+BLOG_SITEMAP_CHUNK_SIZE = 2000
+BLOG_SITEMAP_MAX_AGE = 60 * 60
+
+# Компилировать шаблоны и строить маршруты при запуске процесса
+# (blog.warmup). Включено в blogicum.settings_production.
+BLOG_WARMUP_ON_START = False
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -144,6 +227,61 @@ LOGIN_REDIRECT_URL = 'blog:index'
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Ширина уменьшенных копий изображений постов (JPEG/PNG и WebP).
+POST_IMAGE_VARIANT_WIDTHS = {'thumb': 320, 'medium': 768}
+
+POST_IMAGE_QUALITY = 82
+
+# Изображения без ссылок удаляет manage.py collect_images (по расписанию),
+# если файл не менялся дольше этого числа секунд.
+POST_IMAGE_COLLECT_GRACE = 60 * 60 * 24
+
+# Ограничения загрузки изображений постов. Обработчик blog.uploads
+# подключается только в представлениях создания и изменения поста.
+POST_IMAGE_MAX_UPLOAD_SIZE = 10 * 2 ** 20
+POST_IMAGE_MAX_DIMENSIONS = (8000, 8000)
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+
+# Курсорная пагинация лент постов (?after=/?before=) вместо номеров страниц.
+POSTS_CURSOR_PAGINATION = False
+
+# Учет SQL-запросов на каждый запрос: заголовок Server-Timing,
+# бюджеты по именам маршрутов и поиск повторяющихся запросов (N+1).
+QUERY_BUDGET_ENABLED = DEBUG
+
+QUERY_BUDGET_DEFAULT = None
+
+# Бюджеты измерены без кэша для автора поста (сессия и пользователь
+# входят в счет). Сохранение поста в edit_post: пост, категория
+# и местоположение формы с проверкой их существования, прежние
+# значения полей, UPDATE и две записи поискового индекса.
+QUERY_BUDGETS = {
+    'blog:index': 4,
+    'blog:category_posts': 6,
+    'blog:profile': 6,
+    'blog:post_detail': 5,
+    'blog:edit_post': 11,
+}
+
+QUERY_REPEAT_THRESHOLD = 3
+
+# Фоновые задачи (manage.py run_worker). При JOBS_RUN_IMMEDIATELY
+# задачи выполняются сразу в процессе, который их поставил.
+JOBS_RUN_IMMEDIATELY = False
+
+# Через сколько секунд зависшая задача возвращается в очередь.
+JOBS_LOCK_TIMEOUT = 60 * 10
+
+# Задержка перед повтором: JOBS_BACKOFF_BASE * 2 ** (попытка - 1) секунд.
+JOBS_BACKOFF_BASE = 5
+
+JOBS_BACKOFF_MAX = 60 * 60
+
+# Поиск по постам (blog.search): 'auto' — SQLite FTS5, если доступен,
+# иначе обратный индекс в таблице; 'fts5' или 'python' — явный выбор.
+BLOG_SEARCH_BACKEND = 'auto'
+# Во сколько раз слово в заголовке весомее слова в тексте.
+BLOG_SEARCH_TITLE_WEIGHT = 10
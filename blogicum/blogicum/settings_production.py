@@ -0,0 +1,52 @@
+"""
+Production settings for blogicum project.
+
+Use with DJANGO_SETTINGS_MODULE=blogicum.settings_production.
+"""
+
+import os
+
+from .settings import *  # noqa: F401, F403
+from .settings import TEMPLATES
+
+DEBUG = False
+
+# Имена хостов сайта через запятую, например "blogicum.ru,www.blogicum.ru".
+ALLOWED_HOSTS = [
+    host.strip()
+    for host in os.getenv('BLOGICUM_ALLOWED_HOSTS', '').split(',')
+    if host.strip()
+]
+
+# Кэш общий для всех процессов: версии групп и сброс кэша сигналами
+# должны быть видны каждому воркеру.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv(
+            'BLOGICUM_CACHE_DIR', '/var/tmp/blogicum_cache'
+        ),
+    }
+}
+
+QUERY_BUDGET_ENABLED = DEBUG
+
+# Кешированный загрузчик хранит скомпилированные шаблоны в памяти
+# процесса; при явном списке загрузчиков APP_DIRS должен быть выключен.
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            **TEMPLATES[0]['OPTIONS'],
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    },
+]
+
+BLOG_WARMUP_ON_START = True
@@ -0,0 +1,23 @@
+import time
+
+import pytest
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Часы кэша, которые тест может перевести вперед."""
+    from blog import caching
+
+    offset = [0]
+
+    class Clock:
+        @staticmethod
+        def time():
+            return time.time() + offset[0]
+
+        @staticmethod
+        def advance(seconds):
+            offset[0] += seconds
+
+    monkeypatch.setattr(caching, "time", Clock)
+    return Clock
@@ -0,0 +1,70 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.admin import PREVIEW_LENGTH
+
+pytestmark = [pytest.mark.django_db]
+
+
+def changelist_queries(admin_client, url):
+    admin_client.get(url)
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    return response, queries
+
+
+@pytest.mark.parametrize("model", ["post", "comment"])
+def test_changelist_queries_do_not_grow(admin_client, mixer, user, model):
+    url = f"/admin/blog/{model}/"
+    mixer.cycle(2).blend("blog.Comment", author=user, post__author=user)
+    _, few = changelist_queries(admin_client, url)
+    mixer.cycle(10).blend("blog.Comment", author=user, post__author=user)
+    _, many = changelist_queries(admin_client, url)
+    assert len(many) == len(few)
+
+
+def test_changelist_skips_heavy_columns(admin_client, mixer, user):
+    post = mixer.blend("blog.Post", author=user, text="Слово " * 100)
+    response, queries = changelist_queries(admin_client, "/admin/blog/post/")
+    content = response.content.decode()
+    assert post.text not in content
+    assert post.text[:PREVIEW_LENGTH - 1].strip() in content
+    for query in queries.captured_queries:
+        sql = query["sql"].replace('SUBSTR("blog_post"."text"', "")
+        assert '"blog_post"."text"' not in sql
+        assert '"blog_post"."image_variants"' not in sql
+
+
+def test_changelist_has_no_full_count(admin_client, mixer, user):
+    mixer.cycle(3).blend("blog.Post", author=user)
+    _, queries = changelist_queries(
+        admin_client, "/admin/blog/post/?q=nothing"
+    )
+    counts = [
+        query for query in queries.captured_queries
+        if "COUNT(" in query["sql"]
+    ]
+    assert len(counts) == 1
+
+
+def test_post_form_uses_autocomplete(admin_client, mixer, user):
+    mixer.cycle(3).blend("blog.Location")
+    response = admin_client.get("/admin/blog/post/add/")
+    content = response.content.decode()
+    for field in ("author", "location", "category"):
+        assert f'data-field-name="{field}"' in content
+    autocomplete = admin_client.get(
+        "/admin/autocomplete/",
+        {
+            "app_label": "blog",
+            "model_name": "post",
+            "field_name": "author",
+            "term": user.username,
+        },
+    )
+    assert autocomplete.status_code == HTTPStatus.OK
+    assert str(user.pk) in autocomplete.content.decode()
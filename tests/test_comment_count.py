@@ -0,0 +1,93 @@
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comments(
+        user_client, another_user, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.post(f"/posts/{post.id}/comment/", data={"text": "Текст"})
+    mixer.cycle(2).blend("blog.Comment", post=post, author=another_user)
+    post.refresh_from_db()
+    assert post.comment_count == 3
+
+    comment = post.comments.filter(author=post.author).get()
+    user_client.post(f"/posts/{post.id}/delete_comment/{comment.id}/")
+    post.refresh_from_db()
+    assert post.comment_count == 2
+
+    another_user.delete()
+    post.refresh_from_db()
+    assert post.comment_count == 0
+
+
+def test_recount_comments_repairs_counters(
+        mixer, user, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post, author=user)
+    type(post).objects.update(comment_count=42)
+    call_command("recount_comments", batch_size=1)
+    post.refresh_from_db()
+    assert post.comment_count == 2
+
+
+def test_post_delete_skips_per_comment_updates(
+        mixer, user, post_with_published_location
+):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    post = post_with_published_location
+    mixer.cycle(5).blend("blog.Comment", post=post, author=user)
+    with CaptureQueriesContext(connection) as queries:
+        post.delete()
+    assert not [
+        query for query in queries.captured_queries
+        if query["sql"].startswith('UPDATE "blog_post"')
+    ]
+
+
+def test_moved_comment_counted_on_both_posts(
+        mixer, user, post_with_published_location, post_with_another_category
+):
+    source = post_with_published_location
+    target = post_with_another_category
+    comments = mixer.cycle(2).blend("blog.Comment", post=source, author=user)
+    comment = type(comments[0]).objects.get(pk=comments[0].pk)
+    comment.post = target
+    comment.save()
+    comment.save()
+    source.refresh_from_db()
+    target.refresh_from_db()
+    assert (source.comment_count, target.comment_count) == (1, 1)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_failed_post_delete_does_not_skip_later_updates(
+        mixer, user, post_with_published_location
+):
+    from django.db import DatabaseError
+    from django.db.models.signals import pre_delete
+
+    from blog.models import Post
+
+    post = post_with_published_location
+    comment = mixer.cycle(2).blend(
+        "blog.Comment", post=post, author=user
+    )[0]
+
+    def fail(sender, instance, **kwargs):
+        raise DatabaseError("database is locked")
+
+    pre_delete.connect(fail, sender=Post)
+    try:
+        with pytest.raises(DatabaseError):
+            post.delete()
+    finally:
+        pre_delete.disconnect(fail, sender=Post)
+    comment.delete()
+    post.refresh_from_db()
+    assert post.comment_count == 1
@@ -0,0 +1,54 @@
+from http import HTTPStatus
+
+import pytest
+from django.test import override_settings
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def many_comments(mixer, user, post_with_published_location):
+    return mixer.cycle(5).blend(
+        "blog.Comment", post=post_with_published_location, author=user
+    )
+
+
+@override_settings(COMMENTS_PER_PAGE=2)
+def test_detail_renders_first_comment_page(
+        user_client, post_with_published_location, many_comments
+):
+    post = post_with_published_location
+    response = user_client.get(f"/posts/{post.id}/")
+    comments = response.context["comments"]
+    assert [c.id for c in comments] == [c.id for c in many_comments[:2]]
+    assert comments.has_next()
+    assert f"/posts/{post.id}/comments/?after=" in response.content.decode()
+
+
+@override_settings(COMMENTS_PER_PAGE=2)
+def test_comment_pages_endpoint(
+        client, post_with_published_location, many_comments
+):
+    url = f"/posts/{post_with_published_location.id}/comments/"
+    seen = []
+    next_url = f"{url}?format=json"
+    while next_url:
+        data = client.get(next_url).json()
+        seen += [comment["id"] for comment in data["comments"]]
+        next_url = data["next"]
+    assert seen == [comment.id for comment in many_comments]
+
+    fragment = client.get(url)
+    assert fragment.status_code == HTTPStatus.OK
+    assert "<html" not in fragment.content.decode()
+
+
+def test_comment_pages_respect_publication(
+        client, mixer, user, published_category
+):
+    hidden = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=False
+    )
+    response = client.get(f"/posts/{hidden.id}/comments/")
+    assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,140 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _urls(post):
+    return (
+        f"/posts/{post.id}/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+    )
+
+
+def test_unchanged_pages_return_304(
+        client, clock, post_with_published_location
+):
+    for url in _urls(post_with_published_location):
+        client.get(url)
+    clock.advance(2)
+    for url in _urls(post_with_published_location):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.has_header("Last-Modified")
+        etag = response["ETag"]
+        repeated = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert repeated.status_code == HTTPStatus.NOT_MODIFIED
+        repeated = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        assert repeated.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_new_comment_changes_etag(
+        client, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    etags = [client.get(url)["ETag"] for url in _urls(post)]
+    user_client.post(f"/posts/{post.id}/comment/", data={"text": "Текст"})
+    for url, etag in zip(_urls(post), etags):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+
+
+def test_etag_depends_on_user(
+        client, user_client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    etag = client.get(url)["ETag"]
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_no_last_modified_within_current_second(
+        client, post_with_published_location
+):
+    response = client.get(_urls(post_with_published_location)[1])
+    assert response.has_header("ETag")
+    assert not response.has_header("Last-Modified")
+
+
+def _unpublish(post, category):
+    post.is_published = False
+    post.save()
+
+
+def _move(post, category):
+    post.category = category
+    post.save()
+
+
+@pytest.mark.parametrize(
+    "change",
+    [lambda post, category: post.delete(), _unpublish, _move],
+    ids=["delete", "unpublish", "move"],
+)
+def test_if_modified_since_after_removal_from_page(
+        client, clock, mixer, post_with_published_location, another_category,
+        change
+):
+    post = post_with_published_location
+    older = mixer.blend(
+        "blog.Post",
+        author=post.author,
+        category=post.category,
+        location=post.location,
+        is_published=True,
+        pub_date=post.pub_date - timedelta(days=1),
+    )
+    Post.objects.filter(pk=older.pk).update(
+        updated_at=timezone.now() - timedelta(days=1)
+    )
+    urls = _urls(post)[1:]
+    for url in urls:
+        client.get(url)
+    clock.advance(2)
+    last_modified = [client.get(url)["Last-Modified"] for url in urls]
+    clock.advance(2)
+    # Меняется старый пост: даты оставшихся строк прежние.
+    change(older, another_category)
+    clock.advance(2)
+    for url, since in zip(urls, last_modified):
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+        assert response.status_code == HTTPStatus.OK
+
+
+def test_hidden_post_404_with_if_modified_since(
+        client, user_client, clock, mixer, user, published_category
+):
+    future = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() + timedelta(days=1),
+    )
+    unpublished = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=False,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    urls = ["/posts/999999/", f"/posts/{future.pk}/"]
+    urls.append(f"/posts/{unpublished.pk}/")
+    for url in urls:
+        client.get(url)
+    clock.advance(2)
+    since = "Fri, 01 Jan 2100 00:00:00 GMT"
+    for url in urls:
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+        assert response.status_code == HTTPStatus.NOT_FOUND, url
+    # Автор видит свои скрытые посты и получает для них 304.
+    response = user_client.get(urls[1], HTTP_IF_MODIFIED_SINCE=since)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
@@ -0,0 +1,90 @@
+from http import HTTPStatus
+
+import pytest
+
+from blog import counting
+from blog.models import Post
+from blog.paginators import ApproximateCountPaginator
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts(mixer, user):
+    return mixer.cycle(5).blend("blog.Post", author=user)
+
+
+def test_exact_below_threshold(posts, settings, mixer):
+    settings.BLOG_EXACT_COUNT_THRESHOLD = 10
+    assert counting.approximate_count(Post.objects.all()) == 5
+    mixer.blend("blog.Post", author=posts[0].author)
+    assert counting.approximate_count(Post.objects.all()) == 6
+
+
+def test_sampled_above_threshold(
+    posts, settings, mixer, django_assert_num_queries
+):
+    settings.BLOG_EXACT_COUNT_THRESHOLD = 2
+    assert counting.approximate_count(Post.objects.all()) == 5
+    mixer.blend("blog.Post", author=posts[0].author)
+    # Только ограниченный подсчет: полный берется из кэша.
+    with django_assert_num_queries(1):
+        assert counting.approximate_count(Post.objects.all()) == 5
+
+
+def test_planner_estimate(posts, settings, monkeypatch):
+    settings.BLOG_EXACT_COUNT_THRESHOLD = 2
+    assert counting.planner_estimate(Post.objects.all()) is None
+    monkeypatch.setattr(counting, "planner_estimate", lambda queryset: 1000)
+    assert counting.approximate_count(Post.objects.all()) == 1000
+    monkeypatch.setattr(counting, "planner_estimate", lambda queryset: 1)
+    assert counting.approximate_count(Post.objects.all()) == 3
+
+
+@pytest.mark.parametrize("plan", [
+    [{"Plan": {"Plan Rows": 1234}}],
+    '[{"Plan": {"Plan Rows": 1234}}]',
+])
+def test_planner_estimate_parses_plan(monkeypatch, plan):
+    executed = []
+
+    class Cursor:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            return False
+
+        def execute(self, sql, params):
+            executed.append(sql)
+
+        def fetchone(self):
+            return (plan,)
+
+    class Connection:
+        vendor = "postgresql"
+
+        def cursor(self):
+            return Cursor()
+
+    monkeypatch.setattr(counting, "connections", {"default": Connection()})
+    assert counting.planner_estimate(Post.objects.filter(pk__gt=1)) == 1234
+    assert executed[0].startswith("EXPLAIN (FORMAT JSON) SELECT")
+
+
+def test_paginator_uses_approximate_count(posts, settings):
+    settings.BLOG_EXACT_COUNT_THRESHOLD = 2
+    paginator = ApproximateCountPaginator(
+        Post.objects.order_by("pk"), 2, count_key="posts"
+    )
+    assert paginator.num_pages == 3
+    assert list(paginator.page(3)) == [posts[-1]]
+
+
+@pytest.mark.parametrize("model", ["post", "comment"])
+def test_admin_changelist_paginator(admin_client, posts, model):
+    response = admin_client.get(f"/admin/blog/{model}/")
+    assert response.status_code == HTTPStatus.OK
+    assert isinstance(
+        response.context["cl"].paginator, ApproximateCountPaginator
+    )
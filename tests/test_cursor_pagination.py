@@ -0,0 +1,94 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core.paginator import InvalidPage
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.paginators import decode_token, encode_token
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_posts(mixer, user, published_category):
+    now = timezone.now()
+    # Посты попарно имеют одинаковую дату: проверяется устойчивость порядка.
+    pub_dates = [
+        now - timedelta(hours=n // 2 + 1) for n in range(N_PER_PAGE * 2)
+    ]
+    return mixer.cycle(N_PER_PAGE * 2).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=(date for date in pub_dates),
+    )
+
+
+def _page_ids(response):
+    return [post.id for post in response.context["page_obj"]]
+
+
+@override_settings(POSTS_CURSOR_PAGINATION=True)
+def test_cursor_pages_cover_feed(client, feed_posts):
+    expected = [
+        post.id for post in sorted(
+            feed_posts, key=lambda post: (post.pub_date, post.id),
+            reverse=True
+        )
+    ]
+    first = client.get("/")
+    assert first.status_code == HTTPStatus.OK
+    page_obj = first.context["page_obj"]
+    assert _page_ids(first) == expected[:N_PER_PAGE]
+    assert page_obj.has_next() and not page_obj.has_previous()
+
+    second = client.get("/", {"after": page_obj.next_cursor})
+    assert _page_ids(second) == expected[N_PER_PAGE:]
+    assert not second.context["page_obj"].has_next()
+
+    back = client.get(
+        "/", {"before": second.context["page_obj"].previous_cursor}
+    )
+    assert _page_ids(back) == expected[:N_PER_PAGE]
+    assert "?after=" in back.content.decode()
+
+
+@override_settings(POSTS_CURSOR_PAGINATION=True)
+def test_cursor_is_stable_under_inserts(
+        client, mixer, user, published_category, feed_posts
+):
+    first = client.get("/")
+    mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(minutes=1),
+    )
+    second = client.get("/", {"after": first.context["page_obj"].next_cursor})
+    assert not set(_page_ids(first)) & set(_page_ids(second))
+    assert len(_page_ids(second)) == N_PER_PAGE
+
+
+@override_settings(POSTS_CURSOR_PAGINATION=True)
+def test_invalid_cursor_returns_404(client, feed_posts):
+    response = client.get("/", {"after": "not-a-cursor"})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.parametrize(
+    "token", ["%%%", "bm90IGpzb24", "WzFd", "eyJhIjogMX0"]
+)
+def test_decode_token_rejects_bad_tokens(token):
+    with pytest.raises(InvalidPage):
+        decode_token(token, [float, int])
+
+
+def test_token_round_trip():
+    token = encode_token([1.5, 7])
+    assert "=" not in token
+    assert decode_token(token, [float, int]) == [1.5, 7]
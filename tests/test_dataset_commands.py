@@ -0,0 +1,97 @@
+import json
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.management.commands.generate_dataset import Command
+from blog.models import Category, Comment, Post, User
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def dataset(mixer):
+    # Удаленные строки оставляют пропуски в ключах.
+    for model in ("auth.User", "blog.Category", "blog.Post"):
+        mixer.blend(model).delete()
+    call_command(
+        "generate_dataset",
+        "--users", "3",
+        "--categories", "2",
+        "--locations", "2",
+        "--posts", "7",
+        "--comments", "20",
+        "--batch-size", "2",
+        stdout=StringIO(),
+    )
+
+
+def test_generate_dataset_links_existing_rows(dataset):
+    assert Post.objects.count() == 7
+    assert Comment.objects.count() == 20
+    posts = Post.objects.values_list("author_id", "category_id")
+    assert {author for author, _ in posts} <= set(
+        User.objects.values_list("pk", flat=True)
+    )
+    assert {category for _, category in posts} <= set(
+        Category.objects.values_list("pk", flat=True)
+    )
+    assert set(Comment.objects.values_list("post_id", flat=True)) <= set(
+        Post.objects.values_list("pk", flat=True)
+    )
+
+
+def test_insert_without_pks_reads_nothing(
+    post_with_published_location, user
+):
+    command = Command(stdout=StringIO())
+    command.batch_size = 2
+    with CaptureQueriesContext(connection) as queries:
+        pks = command.insert(
+            Comment, 5,
+            lambda n: Comment(
+                text="Текст", post=post_with_published_location, author=user
+            ),
+            collect_pks=False,
+        )
+    assert pks == []
+    assert Comment.objects.count() == 5
+    assert not any(
+        query["sql"].startswith("SELECT") for query in queries.captured_queries
+    )
+
+
+def test_benchmark_views_reports_cold_and_cached(dataset, tmp_path):
+    output = tmp_path / "report.json"
+    call_command(
+        "benchmark_views",
+        "--iterations", "2",
+        "--warmup", "1",
+        "--only", "index", "post_detail", "edit_post",
+        "--output", str(output),
+        stdout=StringIO(),
+    )
+    views = json.loads(output.read_text(encoding="utf-8"))["views"]
+    assert set(views) == {
+        "index", "index_cached", "post_detail", "post_detail_cached",
+        "edit_post",
+    }
+    assert views["index"]["status"] == HTTPStatus.OK
+    assert views["edit_post"]["status"] == HTTPStatus.FOUND
+    # Без кэша страница читается из базы, с кэшем — нет.
+    assert views["index"]["queries"] > views["index_cached"]["queries"]
+
+
+def test_sample_fixture_loads(settings):
+    call_command(
+        "loaddata", str(settings.BASE_DIR.parent / "db.json"),
+        stdout=StringIO(),
+    )
+    assert Post.objects.exists()
+    assert not Post.objects.filter(updated_at__isnull=True).exists()
+    post = Post.objects.order_by("pk").first()
+    assert post.updated_at == post.created_at
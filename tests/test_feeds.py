@@ -0,0 +1,129 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_post(mixer, user, published_category, published_location):
+    return mixer.blend(
+        "blog.Post",
+        title="Пост для ленты",
+        author=user,
+        category=published_category,
+        location=published_location,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
+@pytest.fixture
+def feed_urls(feed_post):
+    return [
+        "/rss/",
+        "/atom/",
+        f"/category/{feed_post.category.slug}/rss/",
+        f"/category/{feed_post.category.slug}/atom/",
+        f"/profile/{feed_post.author.username}/rss/",
+        f"/profile/{feed_post.author.username}/atom/",
+    ]
+
+
+def test_feeds_list_published_posts(
+    client, feed_urls, feed_post, mixer, clock
+):
+    hidden = mixer.blend(
+        "blog.Post",
+        title="Скрытый пост",
+        author=feed_post.author,
+        category=feed_post.category,
+        is_published=False,
+    )
+    # Last-Modified отдается после секунды последней смены версий.
+    clock.advance(1)
+    for url in feed_urls:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, url
+        assert "xml" in response["Content-Type"]
+        content = response.content.decode()
+        assert feed_post.title in content
+        assert hidden.title not in content
+        assert response["ETag"]
+        assert response["Last-Modified"]
+
+
+def test_feed_selects_only_needed_columns(client, feed_post):
+    with CaptureQueriesContext(connection) as queries:
+        client.get("/rss/")
+    post_queries = [
+        query["sql"] for query in queries.captured_queries
+        if '"blog_post"' in query["sql"]
+    ]
+    assert post_queries
+    for sql in post_queries:
+        assert "blog_location" not in sql
+        assert '"blog_post"."image"' not in sql
+
+
+def test_unpublished_category_feed_404(client, feed_post):
+    feed_post.category.is_published = False
+    feed_post.category.save()
+    response = client.get(f"/category/{feed_post.category.slug}/rss/")
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_cached_feed_and_304(
+    client, feed_post, clock, django_assert_num_queries
+):
+    clock.advance(1)
+    response = client.get("/rss/")
+    etag = response["ETag"]
+    with django_assert_num_queries(0):
+        cached = client.get("/rss/")
+        not_modified = client.get("/rss/", HTTP_IF_NONE_MATCH=etag)
+    assert cached.content == response.content
+    assert cached["Content-Type"] == response["Content-Type"]
+    assert cached["Last-Modified"] == response["Last-Modified"]
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_feed_expires_when_scheduled_post_appears(
+    client, feed_post, mixer, monkeypatch
+):
+    from blog import caching
+
+    mixer.blend(
+        "blog.Post",
+        author=feed_post.author,
+        category=feed_post.category,
+        is_published=True,
+        pub_date=timezone.now() + timedelta(minutes=3),
+    )
+    timeouts = []
+    cache_set = caching.cache.set
+
+    def spy(key, value, timeout=None, **kwargs):
+        if key.startswith("blog:feed:"):
+            timeouts.append(timeout)
+        return cache_set(key, value, timeout, **kwargs)
+
+    monkeypatch.setattr(caching.cache, "set", spy)
+    client.get("/rss/")
+    assert len(timeouts) == 1
+    assert 120 < timeouts[0] <= 240
+
+
+def test_feed_invalidated_on_post_change(client, feed_post):
+    etag = client.get("/atom/")["ETag"]
+    feed_post.title = "Новый заголовок"
+    feed_post.save()
+    response = client.get("/atom/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert "Новый заголовок" in response.content.decode()
+    profile_feed = client.get(f"/profile/{feed_post.author.username}/rss/")
+    assert "Новый заголовок" in profile_feed.content.decode()
@@ -0,0 +1,122 @@
+import hashlib
+import os
+import time
+from io import BytesIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from PIL import Image
+
+pytestmark = [pytest.mark.django_db]
+
+
+def image_bytes(color):
+    img_io = BytesIO()
+    Image.new("RGB", (400, 200), color=color).save(img_io, "JPEG")
+    return img_io.getvalue()
+
+
+@pytest.fixture
+def make_post(mixer, user, published_category):
+    def make(content, author=user, name="image.jpg"):
+        return mixer.blend(
+            "blog.Post",
+            author=author,
+            category=published_category,
+            is_published=True,
+            image=ImageFile(BytesIO(content), name=name),
+        )
+    return make
+
+
+def test_same_content_stored_once(make_post):
+    content = image_bytes((10, 20, 30))
+    first = make_post(content, name="first.JPG")
+    second = make_post(content, name="second.jpg")
+    digest = hashlib.sha256(content).hexdigest()
+    assert first.image.name == second.image.name
+    assert first.image.name == f"post_images/{digest[:2]}/{digest}.jpg"
+    with first.image.storage.open(first.image.name) as file:
+        assert file.read() == content
+
+
+def collect():
+    call_command("collect_images", "--grace", "0")
+
+
+def test_shared_image_kept_until_last_reference(make_post):
+    content = image_bytes((40, 50, 60))
+    first = make_post(content)
+    second = make_post(content)
+    call_command("run_worker", "--once", "--processes", "0")
+    second.refresh_from_db()
+    assert second.image_variants
+    storage = first.image.storage
+    name = first.image.name
+    variant_names = [v["webp"] for v in second.image_variants.values()]
+
+    first.delete()
+    collect()
+    assert storage.exists(name)
+    assert all(default_storage.exists(n) for n in variant_names)
+
+    second.delete()
+    assert storage.exists(name)
+    collect()
+    assert not storage.exists(name)
+    assert not any(default_storage.exists(n) for n in variant_names)
+
+
+def test_replaced_image_collected(make_post):
+    post = make_post(image_bytes((70, 80, 90)))
+    storage = post.image.storage
+    old_name = post.image.name
+    post.image = ImageFile(BytesIO(image_bytes((1, 2, 3))), name="new.jpg")
+    post.save()
+    collect()
+    assert storage.exists(post.image.name)
+    assert not storage.exists(old_name)
+
+
+def test_author_cascade_delete_collects_images(make_post, another_user):
+    post = make_post(image_bytes((5, 5, 5)), author=another_user)
+    storage = post.image.storage
+    another_user.delete()
+    collect()
+    assert not storage.exists(post.image.name)
+
+
+def test_recent_upload_survives_collection(make_post):
+    from blog.images import collect_images
+
+    content = image_bytes((15, 25, 35))
+    post = make_post(content)
+    storage = post.image.storage
+    name = post.image.name
+    path = storage.path(name)
+    old = time.time() - 3600
+    os.utime(path, (old, old))
+    post.delete()
+    # Та же картинка загружается заново, пост с ней еще не сохранен.
+    assert storage.save("post_images/again.jpg", ImageFile(
+        BytesIO(content), name="again.jpg"
+    )) == name
+    assert collect_images(grace=60) == 0
+    assert storage.exists(name)
+    os.utime(path, (old, old))
+    assert collect_images(grace=60) == 1
+    assert not storage.exists(name)
+
+
+def test_touched_file_is_restored(make_post):
+    post = make_post(image_bytes((45, 55, 65)))
+    storage = post.image.storage
+    assert not storage.delete_unmodified(post.image.name, time.time() - 60)
+    assert storage.exists(post.image.name)
+    assert not [
+        filename for filename in storage.listdir(
+            os.path.dirname(post.image.name)
+        )[1] if filename.endswith(".trash")
+    ]
@@ -0,0 +1,77 @@
+from io import BytesIO
+
+import pytest
+from bs4 import BeautifulSoup
+from django.core.files.images import ImageFile
+from django.core.management import call_command
+from PIL import Image
+
+pytestmark = [pytest.mark.django_db]
+
+
+def run_jobs():
+    call_command("run_worker", "--once", "--processes", "0")
+
+
+@pytest.fixture
+def post_with_large_image(mixer, user, published_category):
+    img_io = BytesIO()
+    Image.new("RGB", (1000, 500), color=(73, 109, 137)).save(img_io, "JPEG")
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        image=ImageFile(img_io, name="large_image.jpg"),
+    )
+
+
+def test_variants_generated_on_upload(user_client, post_with_large_image):
+    post = post_with_large_image
+    run_jobs()
+    post.refresh_from_db()
+    assert set(post.image_variants) == {"thumb", "medium"}
+    storage = post.image.storage
+    for label, width in (("thumb", 320), ("medium", 768)):
+        variant = post.image_variants[label]
+        for key, image_format in (("src", "JPEG"), ("webp", "WEBP")):
+            with storage.open(variant[key]) as file:
+                image = Image.open(file)
+                assert image.format == image_format
+                assert image.size == (width, width // 2)
+
+    html = user_client.get("/").content.decode()
+    soup = BeautifulSoup(html, features="html.parser")
+    assert soup.find("source", type="image/webp")["srcset"].count("w,") == 1
+    assert "320w" in soup.find("img", srcset=True)["srcset"]
+
+
+def test_small_image_is_not_upscaled(post_with_published_location):
+    post = post_with_published_location
+    run_jobs()
+    post.refresh_from_db()
+    assert list(post.image_variants) == ["thumb"]
+    assert post.image_variants["thumb"]["width"] == 100
+
+
+def test_variants_backfill_and_cleanup(
+    post_with_large_image, django_capture_on_commit_callbacks
+):
+    post = post_with_large_image
+    run_jobs()
+    post.refresh_from_db()
+    storage = post.image.storage
+    old_names = [v["src"] for v in post.image_variants.values()]
+    type(post).objects.update(image_variants={})
+    call_command("generate_image_variants")
+    post.refresh_from_db()
+    assert post.image_variants
+
+    post.image = None
+    with django_capture_on_commit_callbacks(execute=True):
+        post.save()
+    run_jobs()
+    call_command("collect_images", "--grace", "0")
+    post.refresh_from_db()
+    assert post.image_variants == {}
+    assert not any(storage.exists(name) for name in old_names)
@@ -0,0 +1,157 @@
+import os
+from collections import Counter
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+CALLS = []
+
+
+@pytest.fixture
+def flaky_job():
+    from blog.jobs import HANDLERS, job
+
+    CALLS.clear()
+
+    @job("test_flaky")
+    def flaky(fail_times):
+        CALLS.append(fail_times)
+        if len(CALLS) <= fail_times:
+            raise RuntimeError("Сбой")
+
+    yield
+    HANDLERS.pop("test_flaky")
+
+
+def run_jobs():
+    call_command("run_worker", "--once", "--processes", "0")
+
+
+def test_enqueue_is_idempotent(flaky_job):
+    from blog.jobs import enqueue
+    from blog.models import Job
+
+    enqueue("test_flaky", key="same", fail_times=0)
+    enqueue("test_flaky", key="same", fail_times=0)
+    assert Job.objects.count() == 1
+    run_jobs()
+    assert CALLS == [0]
+    assert Job.objects.get().status == Job.Status.DONE
+
+    enqueue("test_flaky", key="same", fail_times=0)
+    assert Job.objects.get().status == Job.Status.PENDING
+
+
+def test_failed_job_is_retried_with_backoff(flaky_job, settings):
+    from blog.jobs import enqueue
+    from blog.models import Job
+
+    settings.JOBS_BACKOFF_BASE = 60
+    enqueue("test_flaky", key="flaky", fail_times=1)
+    run_jobs()
+    job = Job.objects.get()
+    assert job.status == Job.Status.PENDING
+    assert "Сбой" in job.last_error
+    assert job.run_after > timezone.now()
+
+    run_jobs()
+    assert len(CALLS) == 1
+
+    Job.objects.update(run_after=timezone.now())
+    run_jobs()
+    job.refresh_from_db()
+    assert job.status == Job.Status.DONE
+    assert job.attempts == 2
+
+
+def test_job_fails_after_max_attempts(flaky_job):
+    from blog.jobs import enqueue
+    from blog.models import Job
+
+    enqueue("test_flaky", key="broken", fail_times=10)
+    Job.objects.update(max_attempts=1)
+    run_jobs()
+    assert Job.objects.get().status == Job.Status.FAILED
+
+
+def test_post_image_is_processed_off_request(
+        user_client, post_with_published_location
+):
+    from blog.models import Job
+
+    post = post_with_published_location
+    post.refresh_from_db()
+    assert post.image_variants == {}
+    assert Job.objects.filter(status=Job.Status.PENDING).count() == 1
+    run_jobs()
+    post.refresh_from_db()
+    assert post.image_variants
+
+
+def test_enqueue_running_job_sets_rerun(flaky_job):
+    from blog.jobs import claim_jobs, enqueue, finish_job
+    from blog.models import Job
+
+    enqueue("test_flaky", key="same", fail_times=0)
+    claim_jobs(1)
+    enqueue("test_flaky", key="same", fail_times=3)
+    job = Job.objects.get()
+    assert (job.status, job.rerun) == (Job.Status.RUNNING, True)
+    assert job.payload == {"fail_times": 3}
+    assert finish_job(job.pk) == Job.Status.PENDING
+    job.refresh_from_db()
+    assert (job.status, job.rerun, job.attempts) == (
+        Job.Status.PENDING, False, 0
+    )
+
+
+def test_stale_job_fails_after_max_attempts(flaky_job, settings):
+    from datetime import timedelta
+
+    from blog.jobs import claim_jobs, enqueue
+    from blog.models import Job
+
+    enqueue("test_flaky", key="stale", fail_times=0)
+    enqueue("test_flaky", key="stale-last", fail_times=0)
+    Job.objects.update(
+        status=Job.Status.RUNNING,
+        locked_at=timezone.now() - timedelta(
+            seconds=settings.JOBS_LOCK_TIMEOUT + 1
+        ),
+        attempts=1,
+    )
+    Job.objects.filter(key="stale-last").update(max_attempts=1)
+    assert len(claim_jobs(5)) == 1
+    assert Job.objects.get(key="stale-last").status == Job.Status.FAILED
+    assert Job.objects.get(key="stale").status == Job.Status.RUNNING
+
+
+def test_missing_job_is_skipped():
+    from blog.jobs import execute_job
+    from blog.management.commands.run_worker import Command
+
+    command = Command()
+    command.metrics = Counter()
+    command.durations = {}
+    command.record(*execute_job(10 ** 6))
+    assert command.metrics == Counter(processed=1, skipped=1)
+
+
+def _crash(pk):
+    os._exit(1)
+
+
+def test_broken_pool_fails_claimed_jobs(monkeypatch):
+    from concurrent.futures import ProcessPoolExecutor
+
+    from blog.management.commands import run_worker
+
+    monkeypatch.setattr(run_worker, "execute_job", _crash)
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        results, broken = run_worker.Command().run_in_pool(pool, [1, 2])
+    assert broken
+    assert [pk for pk, *_ in results] == [1, 2]
+    assert all("BrokenProcessPool" in error for _, _, error, _ in results)
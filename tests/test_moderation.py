@@ -0,0 +1,180 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.contrib.messages import get_messages
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.caching import INDEX_GROUP, category_group, get_group_versions
+from blog.models import Comment, Post
+from blog.search import get_search_index
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def make_posts(mixer, user, published_category):
+    def make(count, **kwargs):
+        kwargs.setdefault("author", user)
+        kwargs.setdefault("category", published_category)
+        return mixer.cycle(count).blend(
+            "blog.Post",
+            is_published=True,
+            pub_date=timezone.now() - timedelta(days=1),
+            **kwargs,
+        )
+
+    return make
+
+
+def run_action(admin_client, model, action, objects, **data):
+    response = admin_client.post(
+        f"/admin/blog/{model}/",
+        {
+            "action": action,
+            "_selected_action": [obj.pk for obj in objects],
+            "index": 0,
+            **data,
+        },
+    )
+    assert response.status_code == HTTPStatus.FOUND
+    # Сообщения накапливаются в сессии до показа: берем последнее.
+    messages = get_messages(response.wsgi_request)
+    return [str(message) for message in messages][-1:]
+
+
+def test_unpublish_posts_in_batches(admin_client, make_posts, settings):
+    settings.BLOG_MODERATION_BATCH_SIZE = 2
+    posts = make_posts(5)
+    index_version = get_group_versions([INDEX_GROUP])
+    messages = run_action(admin_client, "post", "unpublish", posts)
+    assert not Post.objects.filter(is_published=True).exists()
+    assert messages == ["Снято с публикации: 5 (пакетов: 3)."]
+    assert get_group_versions([INDEX_GROUP]) != index_version
+    run_action(admin_client, "post", "publish", posts[:2])
+    assert Post.objects.filter(is_published=True).count() == 2
+
+
+def test_update_queries_do_not_grow(admin_client, make_posts):
+    few = make_posts(2)
+    with CaptureQueriesContext(connection) as small:
+        run_action(admin_client, "post", "unpublish", few)
+    many = make_posts(20)
+    with CaptureQueriesContext(connection) as large:
+        run_action(admin_client, "post", "unpublish", many)
+    assert len(large) == len(small)
+    updates = [
+        query for query in large.captured_queries
+        if query["sql"].startswith('UPDATE "blog_post"')
+    ]
+    assert len(updates) == 1
+
+
+def test_move_to_category(admin_client, make_posts, another_category):
+    posts = make_posts(3)
+    groups = [
+        category_group(posts[0].category.slug),
+        category_group(another_category.slug),
+    ]
+    versions = get_group_versions(groups)
+    run_action(
+        admin_client, "post", "move_to_category", posts[:2],
+        category=another_category.pk,
+    )
+    assert Post.objects.filter(category=another_category).count() == 2
+    new_versions = get_group_versions(groups)
+    assert all(old != new for old, new in zip(versions, new_versions))
+    messages = run_action(admin_client, "post", "move_to_category", posts)
+    assert messages == ["Выберите категорию для переноса."]
+
+
+def test_delete_posts_by_author(
+    admin_client, make_posts, mixer, another_user
+):
+    posts = make_posts(3, title="Спам спам")
+    kept = make_posts(1, author=another_user, title="Обычный пост")[0]
+    mixer.cycle(2).blend("blog.Comment", post=posts[1], author=another_user)
+    comment = mixer.blend("blog.Comment", post=kept, author=posts[0].author)
+    messages = run_action(admin_client, "post", "delete_by_author", posts[:1])
+    assert messages == ["Удалено постов: 3 (пакетов: 1)."]
+    assert list(Post.objects.all()) == [kept]
+    assert list(Comment.objects.all()) == [comment]
+    assert get_search_index().search("спам", limit=10) == []
+
+
+def test_delete_comments_recounts_posts(
+    admin_client, make_posts, mixer, user, another_user
+):
+    post, other = make_posts(2)
+    spam = mixer.cycle(3).blend("blog.Comment", post=post, author=another_user)
+    mixer.blend("blog.Comment", post=other, author=another_user)
+    kept = mixer.blend("blog.Comment", post=post, author=user)
+    run_action(admin_client, "comment", "delete_comments", spam[:1])
+    post.refresh_from_db()
+    assert post.comment_count == 3
+    messages = run_action(
+        admin_client, "comment", "delete_by_author", spam[1:2]
+    )
+    assert messages == ["Удалено комментариев: 3 (пакетов: 1)."]
+    assert list(Comment.objects.all()) == [kept]
+    post.refresh_from_db()
+    other.refresh_from_db()
+    assert (post.comment_count, other.comment_count) == (1, 0)
+
+
+def test_unpublish_category_and_location(
+    admin_client, client, make_posts, published_location
+):
+    post = make_posts(1, location=published_location)[0]
+    category_url = f"/category/{post.category.slug}/"
+    assert client.get(category_url).status_code == HTTPStatus.OK
+    run_action(admin_client, "category", "unpublish", [post.category])
+    assert client.get(category_url).status_code == HTTPStatus.NOT_FOUND
+    run_action(admin_client, "location", "unpublish", [published_location])
+    published_location.refresh_from_db()
+    assert not published_location.is_published
+
+
+def test_catalog_changes_do_not_scan_posts(
+    make_posts, published_category, published_location
+):
+    from blog.models import Category, Location
+    from blog.moderation import update_categories, update_locations
+
+    make_posts(3, location=published_location)
+    with CaptureQueriesContext(connection) as queries:
+        update_categories(
+            Category.objects.filter(pk=published_category.pk),
+            is_published=False,
+        )
+        update_locations(
+            Location.objects.filter(pk=published_location.pk),
+            is_published=False,
+        )
+    assert not any(
+        '"blog_post"' in query["sql"] for query in queries.captured_queries
+    )
+
+
+def test_location_change_refreshes_cached_pages(
+    admin_client, client, make_posts, published_location
+):
+    post = make_posts(1, location=published_location)[0]
+    urls = ["/", f"/profile/{post.author.username}/", f"/posts/{post.pk}/"]
+    for url in urls:
+        assert published_location.name in client.get(url).content.decode()
+    run_action(admin_client, "location", "unpublish", [published_location])
+    for url in urls:
+        content = client.get(url).content.decode()
+        assert published_location.name not in content
+
+
+def test_delete_rows_rejects_nested_dependents(user):
+    from django.contrib.auth import get_user_model
+
+    from blog.moderation import delete_rows
+
+    with pytest.raises(ValueError):
+        delete_rows(get_user_model(), [user.pk])
@@ -0,0 +1,164 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _is_cached(client, url):
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    return response.context is None
+
+
+def test_anonymous_pages_are_cached(
+        client, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    urls = (
+        "/",
+        f"/posts/{post.id}/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+    )
+    for url in urls:
+        assert not _is_cached(client, url)
+        assert _is_cached(client, url)
+        assert not _is_cached(user_client, url)
+
+
+def test_comment_purges_only_affected_pages(
+        client, user_client, post_with_published_location,
+        post_with_another_category
+):
+    post = post_with_published_location
+    other_category_url = (
+        f"/category/{post_with_another_category.category.slug}/"
+    )
+    for url in (f"/posts/{post.id}/", other_category_url):
+        client.get(url)
+    user_client.post(f"/posts/{post.id}/comment/", data={"text": "Текст"})
+    response = client.get(f"/posts/{post.id}/")
+    assert response.context is not None
+    assert "Текст" in response.content.decode()
+    assert _is_cached(client, other_category_url)
+
+
+def test_category_change_purges_its_pages(
+        client, post_with_published_location
+):
+    post = post_with_published_location
+    url = f"/category/{post.category.slug}/"
+    client.get(url)
+    post.category.is_published = False
+    post.category.save()
+    assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+
+
+def test_post_card_fragment_is_shared_between_feeds(
+        user_client, post_with_published_location
+):
+    from blog.caching import post_card_stats
+
+    post = post_with_published_location
+    post_card_stats.reset()
+    user_client.get("/")
+    assert post_card_stats.snapshot() == {"hits": 0, "misses": 1}
+    user_client.get(f"/category/{post.category.slug}/")
+    user_client.get(f"/profile/{post.author.username}/")
+    assert post_card_stats.snapshot() == {"hits": 2, "misses": 1}
+
+    user_client.post(f"/posts/{post.id}/comment/", data={"text": "Текст"})
+    response = user_client.get("/")
+    assert post_card_stats.snapshot()["misses"] == 2
+    assert "Комментарии (1)" in response.content.decode()
+
+
+def test_post_cards_read_cache_once_per_page(
+    mixer, post_with_published_location, monkeypatch
+):
+    from blog import caching
+
+    post = post_with_published_location
+    posts = [post] + mixer.cycle(4).blend(
+        "blog.Post", author=post.author, category=post.category
+    )
+    calls = []
+    # LocMemCache выполняет get_many через get, поэтому считаются
+    # только пакетные обращения.
+    for method in ("get_many", "set_many"):
+        original = getattr(caching.cache, method)
+
+        def spy(*args, method=method, original=original, **kwargs):
+            calls.append(method)
+            return original(*args, **kwargs)
+
+        monkeypatch.setattr(caching.cache, method, spy)
+    caching.post_card_stats.reset()
+    cold = caching.render_post_cards(posts)
+    warm = caching.render_post_cards(posts)
+    assert warm == cold
+    # Версии групп и фрагменты — по одному get_many на страницу,
+    # новые карточки сохраняются одним set_many.
+    assert calls == ["get_many", "get_many", "set_many"] + [
+        "get_many", "get_many"
+    ]
+    assert caching.post_card_stats.snapshot() == {"hits": 5, "misses": 5}
+
+
+def test_cached_page_keeps_headers(
+        client, monkeypatch, post_with_published_location
+):
+    from blog.views import Index
+
+    render = Index.render_to_response
+
+    def render_with_headers(self, context, **kwargs):
+        response = render(self, context, **kwargs)
+        response["Cache-Control"] = "public, max-age=60"
+        response["Content-Language"] = "ru"
+        return response
+
+    monkeypatch.setattr(Index, "render_to_response", render_with_headers)
+    first = client.get("/")
+    cached = client.get("/")
+    assert cached.context is None
+    for header in ("Content-Type", "Cache-Control", "Content-Language"):
+        assert cached[header] == first[header]
+
+
+def test_page_expires_when_scheduled_post_appears(
+        client, mixer, post_with_published_location
+):
+    from blog.caching import next_publication, page_cache_timeout
+
+    assert next_publication() is None
+    assert page_cache_timeout(900) == 900
+    post = post_with_published_location
+    scheduled = mixer.blend(
+        "blog.Post",
+        author=post.author,
+        category=post.category,
+        is_published=True,
+        pub_date=timezone.now() + timedelta(minutes=3),
+    )
+    visible_at = next_publication()
+    assert visible_at >= scheduled.pub_date
+    assert visible_at - scheduled.pub_date < timedelta(minutes=1)
+    assert 120 < page_cache_timeout(900) <= 240
+
+
+def test_author_delete_reads_author_once(mixer, user):
+    mixer.cycle(5).blend("blog.Post", author=user)
+    with CaptureQueriesContext(connection) as queries:
+        user.delete()
+    author_reads = [
+        query for query in queries.captured_queries
+        if query["sql"].startswith("SELECT")
+        and 'FROM "auth_user"' in query["sql"]
+    ]
+    assert len(author_reads) <= 1
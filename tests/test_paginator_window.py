@@ -0,0 +1,80 @@
+import re
+from datetime import timedelta
+
+import pytest
+from django.core.paginator import Paginator
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.templatetags.blog_tags import page_window
+from blog.views import PostsListMixin
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def many_pages(mixer, user, published_category, monkeypatch, settings):
+    settings.BLOG_PAGE_CACHE_TIMEOUT = 0
+    monkeypatch.setattr(PostsListMixin, "paginate_by", 1)
+    return mixer.cycle(20).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
+def page_links(response):
+    return re.findall(r'href="\?page=(\d+)"', response.content.decode())
+
+
+def count_queries(queries):
+    return [
+        query for query in queries.captured_queries
+        if "COUNT(" in query["sql"]
+    ]
+
+
+def test_page_window_is_bounded():
+    paginator = Paginator(range(1000), 1)
+    pages = page_window(paginator.page(500))
+    assert pages == [
+        1, Paginator.ELLIPSIS, 498, 499, 500, 501, 502,
+        Paginator.ELLIPSIS, 1000,
+    ]
+    assert page_window(paginator.page(1))[:4] == [1, 2, 3, Paginator.ELLIPSIS]
+
+
+@pytest.mark.parametrize(
+    "url",
+    ["/", "/category/{slug}/", "/profile/{username}/"],
+)
+def test_list_views_render_page_window(client, many_pages, url):
+    post = many_pages[0]
+    url = url.format(slug=post.category.slug, username=post.author.username)
+    response = client.get(url, {"page": 10})
+    links = set(page_links(response))
+    assert {"1", "8", "9", "11", "12", "20"} <= links
+    assert "5" not in links and "15" not in links
+    assert "…" in response.content.decode()
+
+
+def test_total_count_cached_until_posts_change(client, many_pages, mixer):
+    client.get("/")
+    with CaptureQueriesContext(connection) as queries:
+        client.get("/", {"page": 2})
+    assert not count_queries(queries)
+    post = many_pages[0]
+    mixer.blend(
+        "blog.Post",
+        author=post.author,
+        category=post.category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/")
+    assert count_queries(queries)
+    assert "21" in page_links(response)
@@ -0,0 +1,83 @@
+import logging
+
+import pytest
+from django.test import Client, override_settings
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@override_settings(QUERY_BUDGET_ENABLED=True)
+def test_server_timing_header(post_with_published_location):
+    response = Client().get(f"/posts/{post_with_published_location.id}/")
+    assert response["Server-Timing"].startswith("db;dur=")
+    assert 'desc="4 queries"' in response["Server-Timing"]
+
+
+@override_settings(
+    QUERY_BUDGET_ENABLED=True, QUERY_BUDGETS={"blog:index": 1}
+)
+def test_budget_violation_is_logged(caplog, post_with_published_location):
+    with caplog.at_level(logging.WARNING, logger="blog.queries"):
+        Client().get("/")
+    assert "blog:index" in caplog.text
+
+
+@override_settings(QUERY_BUDGET_ENABLED=True)
+def test_views_stay_within_budgets(
+    caplog, settings, mixer, another_user, user_client,
+    post_with_published_location,
+):
+    post = post_with_published_location
+    mixer.cycle(3).blend("blog.Comment", post=post, author=another_user)
+    urls = {
+        "blog:index": "/",
+        "blog:category_posts": f"/category/{post.category.slug}/",
+        "blog:profile": f"/profile/{post.author.username}/",
+        "blog:post_detail": f"/posts/{post.pk}/",
+        "blog:edit_post": f"/posts/{post.pk}/edit/",
+    }
+    assert set(urls) == set(settings.QUERY_BUDGETS)
+    with caplog.at_level(logging.WARNING, logger="blog.queries"):
+        for client in (Client(), user_client):
+            for url in urls.values():
+                client.get(url)
+        response = user_client.post(
+            urls["blog:edit_post"],
+            {
+                "title": "Новый заголовок",
+                "text": "Новый текст",
+                "pub_date": timezone.now().strftime("%Y-%m-%dT%H:%M"),
+                "category": post.category.pk,
+                "location": post.location.pk,
+            },
+        )
+    assert response.status_code == 302
+    assert "Превышен бюджет" not in caplog.text
+
+
+@override_settings(
+    QUERY_BUDGET_ENABLED=True,
+    QUERY_BUDGETS={"blog:sitemap_section": 0},
+)
+def test_streaming_queries_are_counted(caplog, post_with_published_location):
+    response = Client().get("/sitemap-posts-0.xml")
+    assert response.streaming
+    with caplog.at_level(logging.WARNING, logger="blog.queries"):
+        assert "Превышен бюджет" not in caplog.text
+        b"".join(response.streaming_content)
+    assert "blog:sitemap_section" in caplog.text
+
+
+def test_repeated_query_shapes():
+    from blog.middleware import QueryRecorder
+
+    recorder = QueryRecorder()
+    recorder.shapes.update(["SELECT 1", "SELECT 1", "SELECT 2"])
+    assert recorder.repeated_shapes(2) == {"SELECT 1": 2}
+
+
+@override_settings(QUERY_BUDGET_ENABLED=False)
+def test_disabled_by_setting(post_with_published_location):
+    response = Client().get("/")
+    assert not response.has_header("Server-Timing")
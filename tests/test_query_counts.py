@@ -0,0 +1,69 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+# Сессия и пользователь для авторизованного клиента.
+AUTH_QUERIES = 2
+
+
+@pytest.fixture
+def feed_post(mixer, user, many_posts_with_published_locations):
+    post = many_posts_with_published_locations[0]
+    mixer.cycle(3).blend("blog.Comment", post=post, author=user)
+    return post
+
+
+def _url(name, post):
+    return {
+        "index": "/",
+        "category": f"/category/{post.category.slug}/",
+        "profile": f"/profile/{post.author.username}/",
+        "detail": f"/posts/{post.id}/",
+        "edit": f"/posts/{post.id}/edit/",
+        "delete": f"/posts/{post.id}/delete/",
+    }[name]
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        # Подсчет постов и выборка страницы.
+        ("index", 2),
+        # Категория, строки страницы для ETag, подсчет и выборка страницы.
+        ("category", 4),
+        # Автор, строки страницы для ETag, подсчет и выборка страницы.
+        ("profile", 4),
+        # Время изменения для ETag, пост со связями и комментарии.
+        ("detail", 3),
+        # Пост и варианты выбора категории и местоположения в форме.
+        ("edit", 3),
+        ("delete", 1),
+    ],
+)
+def test_author_query_count(
+        user_client, feed_post, django_assert_num_queries, name, expected
+):
+    with django_assert_num_queries(AUTH_QUERIES + expected):
+        user_client.get(_url(name, feed_post))
+
+
+@pytest.mark.parametrize(
+    "name, expected_miss, expected_hit",
+    [
+        # При промахе еще читается ближайшая отложенная публикация,
+        # от нее зависит срок хранения страницы.
+        ("index", 3, 0),
+        ("category", 5, 2),
+        ("profile", 5, 2),
+        ("detail", 4, 1),
+    ],
+)
+def test_anonymous_query_count(
+        client, feed_post, django_assert_num_queries,
+        name, expected_miss, expected_hit
+):
+    url = _url(name, feed_post)
+    with django_assert_num_queries(expected_miss):
+        client.get(url)
+    with django_assert_num_queries(expected_hit):
+        client.get(url)
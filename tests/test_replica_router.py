@@ -0,0 +1,151 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import sqlite3
+
+import pytest
+from django.db import connection, transaction
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import Client
+from django.utils import timezone
+
+from blog.models import Post
+from blog import routers
+from blog.routers import ReplicaRouter, finish_request, start_request
+
+# Внутри транзакции теста чтения идут в основную базу.
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+@pytest.fixture
+def replicas(settings, monkeypatch):
+    settings.DATABASE_REPLICAS = ["replica_0", "replica_1"]
+    healthy = {"replica_0": True, "replica_1": True}
+    monkeypatch.setattr(
+        ReplicaRouter, "check", lambda self, alias: healthy[alias]
+    )
+    return healthy
+
+
+@pytest.fixture
+def router(replicas):
+    return ReplicaRouter()
+
+
+@pytest.fixture
+def request_state():
+    token = start_request(pinned=False)
+    yield
+    finish_request(token)
+
+
+def test_reads_outside_request_go_to_primary(router):
+    assert router.db_for_read(Post) == "default"
+
+
+def read_in_request(router):
+    token = start_request(pinned=False)
+    try:
+        return router.db_for_read(Post)
+    finally:
+        finish_request(token)
+
+
+def test_round_robin_over_requests(router):
+    aliases = [read_in_request(router) for _ in range(4)]
+    assert aliases == ["replica_0", "replica_1", "replica_0", "replica_1"]
+
+
+def test_one_replica_per_request(router, request_state):
+    assert len({router.db_for_read(Post) for _ in range(4)}) == 1
+
+
+def test_other_apps_not_routed(router, request_state, user):
+    assert router.db_for_read(type(user)) is None
+
+
+def test_unhealthy_replica_skipped(router, replicas, settings):
+    settings.REPLICA_HEALTH_CHECK_INTERVAL = 0
+    replicas["replica_0"] = False
+    assert {read_in_request(router) for _ in range(3)} == {"replica_1"}
+    replicas["replica_1"] = False
+    assert read_in_request(router) == "default"
+
+
+def test_health_check_cached(router, replicas):
+    read_in_request(router)
+    replicas["replica_0"] = False
+    assert {read_in_request(router) for _ in range(4)} == {
+        "replica_0", "replica_1"
+    }
+
+
+def test_atomic_block_reads_primary(router, request_state):
+    with transaction.atomic():
+        assert router.db_for_read(Post) == "default"
+
+
+def test_write_pins_request_to_primary(router):
+    token = start_request(pinned=False)
+    assert router.db_for_read(Post) != "default"
+    assert router.db_for_write(Post) == "default"
+    assert router.db_for_read(Post) == "default"
+    assert finish_request(token)
+
+
+def test_pinned_request_reads_primary(router):
+    token = start_request(pinned=True)
+    assert router.db_for_read(Post) == "default"
+    assert not finish_request(token)
+
+
+def test_write_sets_pin_cookie(replicas, user, mixer, published_category):
+    # Реплики в тестах не подключены: чтения уходят в основную базу.
+    replicas.update(replica_0=False, replica_1=False)
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    client = Client()
+    client.force_login(user)
+    response = client.get(f"/posts/{post.pk}/")
+    assert response.status_code == HTTPStatus.OK
+    assert "primary_pin" not in response.cookies
+    response = client.post(
+        f"/posts/{post.pk}/comment/", data={"text": "Новый комментарий"}
+    )
+    assert response.status_code == HTTPStatus.FOUND
+    assert response.cookies["primary_pin"]["max-age"] > 0
+
+
+def test_real_check_of_sqlite_replicas(settings, monkeypatch, tmp_path):
+    settings.DATABASE_REPLICAS = ["missing", "present"]
+    present = tmp_path / "present.sqlite3"
+    with sqlite3.connect(present) as database:
+        database.execute("PRAGMA journal_mode = delete")
+    wrappers = {
+        alias: DatabaseWrapper(
+            {**connection.settings_dict, "NAME": str(path)}, alias=alias
+        )
+        for alias, path in (
+            ("missing", tmp_path / "missing.sqlite3"),
+            ("present", present),
+        )
+    }
+    monkeypatch.setattr(routers, "connections", wrappers)
+    router = ReplicaRouter()
+    try:
+        assert not router.check("missing")
+        assert not (tmp_path / "missing.sqlite3").exists()
+        assert router.check("present")
+    finally:
+        for wrapper in wrappers.values():
+            wrapper.close()
+    # Проверка не переводит реплику в режим WAL.
+    with sqlite3.connect(present) as database:
+        assert database.execute("PRAGMA journal_mode").fetchone()[0] == (
+            "delete"
+        )
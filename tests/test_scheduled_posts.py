@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_index_uses_request_time_boundary(
+        client, mixer, user, published_category
+):
+    # Ленту уже запрашивали до создания постов, как в долгоживущем воркере.
+    client.get("/")
+    now = timezone.now()
+    due_post, scheduled_post = mixer.cycle(2).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=(
+            date for date in (
+                now - timedelta(minutes=1), now + timedelta(minutes=5)
+            )
+        ),
+    )
+    page_ids = [post.id for post in client.get("/").context["page_obj"]]
+    assert due_post.id in page_ids
+    assert scheduled_post.id not in page_ids
@@ -0,0 +1,109 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(params=["fts5", "python"], autouse=True)
+def search_backend(request, settings):
+    settings.BLOG_SEARCH_BACKEND = request.param
+    return request.param
+
+
+@pytest.fixture
+def make_post(mixer, user, published_category):
+    def make(title, text, is_published=True):
+        return mixer.blend(
+            "blog.Post",
+            title=title,
+            text=text,
+            author=user,
+            category=published_category,
+            is_published=is_published,
+            pub_date=timezone.now() - timedelta(days=1),
+        )
+    return make
+
+
+def search(client, query, after=None):
+    params = {"q": query}
+    if after:
+        params["after"] = after
+    response = client.get("/search/", params)
+    assert response.status_code == HTTPStatus.OK
+    return response.context["page_obj"]
+
+
+def test_title_matches_rank_first(client, make_post):
+    in_text = make_post("Заметки", "Про тёплый Самовар и чай")
+    in_title = make_post("Самовар", "Описание")
+    unrelated = make_post("Другое", "Совсем другое")
+    page = search(client, "самовар")
+    assert [post.pk for post in page] == [in_title.pk, in_text.pk]
+    assert unrelated.pk not in [post.pk for post in page]
+    assert list(search(client, "самовар чай")) == [in_text]
+
+
+def test_publication_rules_respected(client, make_post):
+    make_post("Черновик", "скрытый", is_published=False)
+    visible = make_post("Пост", "скрытый")
+    assert list(search(client, "скрытый")) == [visible]
+
+
+def test_index_updated_on_save_and_delete(client, make_post):
+    post = make_post("Первый", "вариант")
+    post.text = "исправленный текст"
+    post.save()
+    assert list(search(client, "вариант")) == []
+    assert list(search(client, "исправленный")) == [post]
+    post.delete()
+    assert list(search(client, "исправленный")) == []
+
+
+def test_cursor_pagination(client, make_post):
+    posts = [make_post(f"Пост {n}", "общее слово") for n in range(23)]
+    seen = []
+    after = None
+    while True:
+        page = search(client, "общее", after)
+        seen.extend(post.pk for post in page)
+        if not page.has_next():
+            break
+        after = page.next_cursor
+    assert len(seen) == len(posts)
+    assert set(seen) == {post.pk for post in posts}
+
+
+def test_invalid_cursor_404(client):
+    response = client.get("/search/", {"q": "слово", "after": "мусор"})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_rebuild_command(client, make_post):
+    post = make_post("Пересборка", "индекса")
+    Post.objects.filter(pk=post.pk).update(title="Обновлено")
+    call_command("rebuild_search_index")
+    assert list(search(client, "обновлено")) == [post]
+    assert list(search(client, "пересборка")) == []
+
+
+def test_index_pages_by_cursor_in_bounded_queries(
+    make_post, django_assert_max_num_queries
+):
+    from blog.search import get_search_index
+
+    posts = [make_post(f"Чайник {n}", "чайник " * (n + 1)) for n in range(5)]
+    index = get_search_index()
+    ranked = index.search("чайник")
+    assert sorted(pk for _, pk in ranked) == sorted(post.pk for post in posts)
+    with django_assert_max_num_queries(2):
+        first = index.search("чайник", limit=2)
+    rest = index.search("чайник", after=first[-1], limit=10)
+    assert first + rest == ranked
+    assert index.search("чайник отсутствует") == []
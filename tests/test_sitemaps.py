@@ -0,0 +1,101 @@
+import re
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def sitemap_posts(mixer, user, published_category):
+    return mixer.cycle(7).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
+def fetch(client, url, **headers):
+    response = client.get(url, **headers)
+    if response.streaming:
+        response.text = b"".join(response.streaming_content).decode()
+    return response
+
+
+def locations(text):
+    return re.findall(r"<loc>http://testserver(.*?)</loc>", text)
+
+
+def test_sitemap_index_and_shards(client, settings, sitemap_posts, mixer):
+    settings.BLOG_SITEMAP_LIMIT = 3
+    settings.BLOG_SITEMAP_CHUNK_SIZE = 2
+    hidden = mixer.blend(
+        "blog.Post",
+        author=sitemap_posts[0].author,
+        category=sitemap_posts[0].category,
+        is_published=False,
+    )
+    index = fetch(client, "/sitemap.xml")
+    assert index.status_code == HTTPStatus.OK
+    assert "max-age" in index["Cache-Control"]
+    shards = locations(index.text)
+    post_shards = [url for url in shards if "sitemap-posts-" in url]
+    assert len(post_shards) >= 3
+    assert any("sitemap-categories-" in url for url in shards)
+    assert any("sitemap-profiles-" in url for url in shards)
+
+    urls = []
+    for shard in post_shards:
+        response = fetch(client, shard)
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming
+        shard_urls = locations(response.text)
+        assert len(shard_urls) <= 3
+        assert "<lastmod>" in response.text
+        urls.extend(shard_urls)
+    assert sorted(urls) == sorted(
+        f"/posts/{post.pk}/" for post in sitemap_posts
+    )
+    assert f"/posts/{hidden.pk}/" not in urls
+
+
+def test_profile_and_category_sections(client, sitemap_posts, another_user):
+    post = sitemap_posts[0]
+    profiles = locations(fetch(client, "/sitemap-profiles-0.xml").text)
+    assert profiles == [f"/profile/{post.author.username}/"]
+    categories = locations(fetch(client, "/sitemap-categories-0.xml").text)
+    assert categories == [f"/category/{post.category.slug}/"]
+
+
+def test_shard_conditional_get(client, sitemap_posts):
+    response = fetch(client, "/sitemap-posts-0.xml")
+    not_modified = client.get(
+        "/sitemap-posts-0.xml", HTTP_IF_NONE_MATCH=response["ETag"]
+    )
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+    sitemap_posts[0].delete()
+    changed = client.get(
+        "/sitemap-posts-0.xml", HTTP_IF_NONE_MATCH=response["ETag"]
+    )
+    assert changed.status_code == HTTPStatus.OK
+
+
+def test_unknown_section_404(client):
+    assert client.get("/sitemap-nothing-0.xml").status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+
+
+def test_shard_beyond_last_range_404(client, sitemap_posts, settings):
+    settings.BLOG_SITEMAP_LIMIT = 2
+    last = (max(post.pk for post in sitemap_posts) - 1) // 2
+    for section in ("posts", "categories", "profiles"):
+        response = client.get(f"/sitemap-{section}-{last + 1}.xml")
+        assert response.status_code == HTTPStatus.NOT_FOUND, section
+    assert client.get(f"/sitemap-posts-{last}.xml").status_code == (
+        HTTPStatus.OK
+    )
@@ -0,0 +1,66 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def file_connection(tmp_path):
+    wrapper = DatabaseWrapper(
+        {**connection.settings_dict, "NAME": str(tmp_path / "db.sqlite3")},
+        alias="pragmas_test",
+    )
+    yield wrapper
+    wrapper.close()
+
+
+def pragma(wrapper, name):
+    with wrapper.cursor() as cursor:
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+
+def test_pragmas_applied_on_connect(file_connection, settings):
+    assert pragma(file_connection, "journal_mode") == "wal"
+    assert pragma(file_connection, "synchronous") == 1
+    assert pragma(file_connection, "busy_timeout") == (
+        settings.SQLITE_PRAGMAS["busy_timeout"]
+    )
+    assert pragma(file_connection, "cache_size") == (
+        settings.SQLITE_PRAGMAS["cache_size"]
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_sqlite_smoke(mixer, user, tmp_path):
+    category = mixer.blend("blog.Category", is_published=True)
+    mixer.cycle(3).blend(
+        "blog.Post",
+        author=user,
+        category=category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    output = tmp_path / "sqlite.json"
+    stdout = StringIO()
+    call_command(
+        "benchmark_sqlite",
+        "--readers", "1",
+        "--writers", "1",
+        "--duration", "0.2",
+        "--output", str(output),
+        stdout=stdout,
+    )
+    results = json.loads(output.read_text(encoding="utf-8"))["results"]
+    assert set(results) == {"default", "tuned"}
+    for result in results.values():
+        assert result["reads_per_second"] > 0
+        assert result["writes_per_second"] > 0
+    assert "tuned" in stdout.getvalue()
@@ -0,0 +1,109 @@
+import os
+from datetime import date
+from http import HTTPStatus
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def image_file(size=(60, 40), image_format="PNG", name="image.png"):
+    img_io = BytesIO()
+    # Шум почти не сжимается: размер файла близок к размеру пикселей.
+    pixels = os.urandom(size[0] * size[1] * 3)
+    Image.frombytes("RGB", size, pixels).save(img_io, image_format)
+    return SimpleUploadedFile(name, img_io.getvalue())
+
+
+@pytest.fixture
+def post_data(published_category):
+    return {
+        "title": "Заголовок",
+        "text": "Текст",
+        "pub_date": date.today().isoformat(),
+        "category": published_category.pk,
+        "is_published": True,
+    }
+
+
+def create(client, data, image):
+    return client.post("/posts/create/", {**data, "image": image})
+
+
+def test_valid_image_accepted(user_client, post_data):
+    response = create(user_client, post_data, image_file())
+    assert response.status_code == HTTPStatus.FOUND
+    post = Post.objects.get()
+    assert post.image.name.endswith(".png")
+    assert post.image.width == 60
+
+
+@pytest.mark.parametrize(
+    "image, error",
+    [
+        (
+            image_file(size=(9000, 10)),
+            "Размеры изображения не должны превышать",
+        ),
+        (
+            SimpleUploadedFile("text.png", b"not an image " * 10),
+            "Загрузите правильное изображение",
+        ),
+        (
+            image_file(image_format="TIFF", name="image.tiff"),
+            "Загрузите правильное изображение",
+        ),
+    ],
+)
+def test_invalid_image_rejected(user_client, post_data, image, error):
+    response = create(user_client, post_data, image)
+    assert response.status_code == HTTPStatus.OK
+    assert error in response.context["form"].errors["image"][0]
+    assert not Post.objects.exists()
+
+
+def test_oversized_file_rejected(user_client, post_data, settings):
+    settings.POST_IMAGE_MAX_UPLOAD_SIZE = 2000
+    settings.DATA_UPLOAD_MAX_MEMORY_SIZE = 10 ** 6
+    response = create(user_client, post_data, image_file(size=(100, 100)))
+    assert response.status_code == HTTPStatus.OK
+    assert "Размер файла не должен превышать" in (
+        response.context["form"].errors["image"][0]
+    )
+    assert not Post.objects.exists()
+
+
+def test_oversized_request_rejected_before_reading_body(
+    user_client, post_data, settings
+):
+    settings.POST_IMAGE_MAX_UPLOAD_SIZE = 2000
+    settings.DATA_UPLOAD_MAX_MEMORY_SIZE = 1000
+    response = create(user_client, post_data, image_file(size=(100, 100)))
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert not Post.objects.exists()
+
+
+def test_handler_limited_to_post_views(user, post_data, settings):
+    from django.conf import global_settings
+    from django.test import Client
+
+    assert settings.FILE_UPLOAD_HANDLERS == (
+        global_settings.FILE_UPLOAD_HANDLERS
+    )
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(user)
+    response = create(client, post_data, image_file())
+    assert response.status_code == HTTPStatus.FORBIDDEN
+    token = client.get("/posts/create/").context["csrf_token"]
+    response = create(
+        client, {**post_data, "csrfmiddlewaretoken": str(token)},
+        image_file(size=(9000, 10)),
+    )
+    assert "Размеры изображения не должны превышать" in (
+        response.context["form"].errors["image"][0]
+    )
@@ -0,0 +1,66 @@
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management import call_command
+
+from blog import warmup
+
+
+def test_warm_templates_compiles_all_templates():
+    names = warmup.warm_templates()
+    expected = {
+        str(path.relative_to(settings.TEMPLATES_DIR))
+        for path in Path(settings.TEMPLATES_DIR).rglob("*.html")
+    }
+    assert set(names) == expected
+    assert {"base.html", "blog/index.html", "includes/post_card.html"} <= (
+        expected
+    )
+
+
+def test_warm_urls_resolves_all_names():
+    names = warmup.warm_urls()
+    assert {"blog:index", "blog:post_detail", "pages:about"} <= set(names)
+    assert all(name.split(":")[0] in ("blog", "pages") for name in names)
+
+
+def test_warm_up_on_start(settings, monkeypatch):
+    calls = []
+    monkeypatch.setattr(warmup, "warm_up", lambda: calls.append(True))
+    apps.get_app_config("blog").ready()
+    assert not calls
+    settings.BLOG_WARMUP_ON_START = True
+    apps.get_app_config("blog").ready()
+    assert calls
+
+
+def test_production_settings_use_cached_loader():
+    from blogicum import settings_production
+
+    assert not settings_production.DEBUG
+    options = settings_production.TEMPLATES[0]["OPTIONS"]
+    assert options["loaders"][0][0] == (
+        "django.template.loaders.cached.Loader"
+    )
+    assert settings_production.BLOG_WARMUP_ON_START
+
+
+def test_production_settings_share_cache_and_restrict_hosts(monkeypatch):
+    import importlib
+
+    from blogicum import settings_production
+
+    monkeypatch.setenv(
+        "BLOGICUM_ALLOWED_HOSTS", "blogicum.ru, www.blogicum.ru"
+    )
+    settings_production = importlib.reload(settings_production)
+    assert settings_production.ALLOWED_HOSTS == [
+        "blogicum.ru", "www.blogicum.ru"
+    ]
+    assert "locmem" not in settings_production.CACHES["default"]["BACKEND"]
+
+
+def test_warm_up_command(capsys):
+    call_command("warm_up")
+    assert "Шаблонов" in capsys.readouterr().out